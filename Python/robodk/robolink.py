@@ -893,23 +893,15 @@ class Robolink:
         #if not pose.isHomogeneous(): # this check is expansive!
         #    print("Warning: pose is not homogeneous!")
         #    print(pose)
-        posebytes = b''
-        for j in range(4):
-            for i in range(4):
-                posebytes = posebytes + struct.pack('>d', pose[i, j])
+        posebytes = struct.pack('>16d', *[pose[i, j] for j in range(4) for i in range(4)])
         self.COM.send(posebytes)
 
     def _rec_pose(self):
         """Receives a pose (4x4 matrix)"""
         posebytes = self.COM.recv(16 * 8)
         posenums = struct.unpack('>16d', posebytes)
-        pose = robomath.Mat(4, 4)
-        cnt = 0
-        for j in range(4):
-            for i in range(4):
-                pose[i, j] = posenums[cnt]
-                cnt = cnt + 1
-        return pose
+        # The pose is sent column by column
+        return robomath.Mat._from_flat16(posenums, column_major=True)
 
     def _send_xyz(self, pos):
         """Sends an xyz vector"""
@@ -5439,7 +5431,7 @@ class Item:
             if tool is not None:
                 pose = pose * tool
             if reference is not None:
-                pose = robomath.invH(reference) * pose
+                pose = robomath.rel_pose(reference, pose)
             return pose
 
     def JointsConfig(self, joints):
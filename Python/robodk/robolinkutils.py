@@ -190,7 +190,7 @@ def getPoseWrt(item1, item2):
     if item2.Type() in [robolink.ITEM_TYPE_ROBOT, robolink.ITEM_TYPE_TOOL]:
         pose2 = getAncestorPose(item2, item2.RDK().ActiveStation())
 
-    return pose2.inv() * pose1
+    return robomath.rel_pose(pose2, pose1)
 
 
 def setPoseAbsIK(item, pose_abs):
@@ -224,7 +224,7 @@ def setPoseAbsIK(item, pose_abs):
         parents.pop(0)
 
     parent_pose_abs = getAncestorPose(parents[0], item.RDK().ActiveStation())
-    pose = parent_pose_abs.inv() * pose_abs
+    pose = robomath.rel_pose(parent_pose_abs, pose_abs)
 
     if item.Type() == robolink.ITEM_TYPE_ROBOT:
         joints = item.SolveIK(pose, tool=item.PoseTool()).list()
@@ -28,6 +28,7 @@
 # --------------------------------------------
 
 import math
+import re
 import time
 
 #----------------------------------------------------
@@ -35,6 +36,45 @@ import time
 
 pi = math.pi  #: PI
 
+# Degree/radian conversion factors
+_D2R = pi / 180.0
+_R2D = 180.0 / pi
+
+_HALF_PI = pi * 0.5
+
+# Direct references to the math functions used internally (avoids the math module attribute lookup and the call to the public wrappers below)
+_sin = math.sin
+_cos = math.cos
+_sqrt = math.sqrt
+_acos = math.acos
+_atan2 = math.atan2
+_hypot = math.hypot
+
+# Monotonic high resolution clock used by tic/toc (time.perf_counter is not available in Python 2)
+_timer = getattr(time, 'perf_counter', time.time)
+
+# Maximum deviation of R*R' from the identity accepted by Mat.isHomogeneous (sum of absolute errors)
+_HOMOGENEOUS_TOL = 1e-4
+
+# Squared cosine of the angle tolerance (0.03 rad) used to detect parallel axes in the point_*axis_2_pose functions
+_COS_PARALLEL_SQ = math.cos(0.03)**2
+
+SKIP_HOMOGENEOUS_CHECK = False  #: Set to True to skip the validation of the input pose in Offset, invH and rel_pose (faster when the poses are known to be homogeneous)
+
+# Pattern of the numbers found in object names (see name_2_id)
+_NUM_RE = re.compile(r'[0-9]+')
+
+# Exact (sin, cos) values of multiples of 90 deg, indexed by the number of quarter turns modulo 4
+_SIN_COS_QUARTER = ((0.0, 1.0), (1.0, 0.0), (0.0, -1.0), (-1.0, 0.0))
+
+# Minimum number of multiplications (m*n*p) and of output values (m*p, with m > 1 and p > 1) of a generic matrix product of floats to use numpy (if available) instead of Python loops.
+# Below these sizes (or for products with a single row or column) converting the lists to numpy arrays and back costs more than the product itself
+_NUMPY_MATMUL_MIN = 100
+_NUMPY_MATMUL_MIN_OUT = 16
+
+# Result of the first import of numpy by _numpy_or_none: the numpy module, or None if numpy is not installed (False until numpy is needed)
+_numpy = False
+
 
 def pause(seconds):
     """Pause in seconds
@@ -53,7 +93,7 @@ def sqrtA(value):
     """Returns the square root of a value if it's greater than 0, else 0 (differs from IEEE-754)."""
     if value <= 0:
         return 0
-    return sqrt(value)
+    return math.sqrt(value)
 
 
 def sin(value):
@@ -86,11 +126,27 @@ def atan2(y, x):
     return math.atan2(y, x)
 
 
+def _sin_cos(angle):
+    """Returns the (sine, cosine) pair of an angle in radians. Angles within 1e-12 quarter turns of a multiple of pi/2 are returned exactly."""
+    quarters = angle / _HALF_PI
+    delta = (quarters + 0.5) % 1.0 - 0.5  # distance to the closest multiple of pi/2 (NaN for NaN or infinite angles)
+    if -1e-12 < delta < 1e-12:
+        return _SIN_COS_QUARTER[int(round(quarters)) & 3]
+    return _sin(angle), _cos(angle)
+
+
+def _sin_cos_deg(angle_deg):
+    """Returns the (sine, cosine) pair of an angle in degrees. Multiples of 90 deg are returned exactly (no sin/cos evaluation and no floating point noise)."""
+    if angle_deg % 90 == 0:
+        return _SIN_COS_QUARTER[int(angle_deg // 90) & 3]
+    angle = angle_deg * _D2R
+    return _sin(angle), _cos(angle)
+
+
 def name_2_id(str_name_id):
     """Returns the number of a numbered object. For example: "Frame 3", "Frame3", "Fram3 3" returns 3."""
-    import re
-    numbers = re.findall(r'[0-9]+', str_name_id)
-    if len(numbers) > 0:
+    numbers = _NUM_RE.findall(str_name_id)
+    if numbers:
         return float(numbers[-1])
     return -1
 
@@ -114,9 +170,8 @@ def rotx(rx):
 
     .. seealso:: :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.roty`, :func:`~robodk.robomath.roty`
     """
-    ct = math.cos(rx)
-    st = math.sin(rx)
-    return Mat([[1, 0, 0, 0], [0, ct, -st, 0], [0, st, ct, 0], [0, 0, 0, 1]])
+    st, ct = _sin_cos(rx)
+    return Mat._from_rows_unsafe([[1, 0, 0, 0], [0, ct, -st, 0], [0, st, ct, 0], [0, 0, 0, 1]])
 
 
 def roty(ry):
@@ -134,9 +189,8 @@ def roty(ry):
 
     .. seealso:: :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.rotz`
     """
-    ct = math.cos(ry)
-    st = math.sin(ry)
-    return Mat([[ct, 0, st, 0], [0, 1, 0, 0], [-st, 0, ct, 0], [0, 0, 0, 1]])
+    st, ct = _sin_cos(ry)
+    return Mat._from_rows_unsafe([[ct, 0, st, 0], [0, 1, 0, 0], [-st, 0, ct, 0], [0, 0, 0, 1]])
 
 
 def rotz(rz):
@@ -154,9 +208,8 @@ def rotz(rz):
 
     .. seealso:: :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.roty`
     """
-    ct = math.cos(rz)
-    st = math.sin(rz)
-    return Mat([[ct, -st, 0, 0], [st, ct, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    st, ct = _sin_cos(rz)
+    return Mat._from_rows_unsafe([[ct, -st, 0, 0], [st, ct, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
 
 
 def transl(tx, ty=None, tz=None):
@@ -184,7 +237,7 @@ def transl(tx, ty=None, tz=None):
         xx = tx
         yy = ty
         zz = tz
-    return Mat([[1, 0, 0, xx], [0, 1, 0, yy], [0, 0, 1, zz], [0, 0, 0, 1]])
+    return Mat._from_rows_unsafe([[1, 0, 0, xx], [0, 1, 0, yy], [0, 0, 1, zz], [0, 0, 0, 1]])
 
 
 def RelTool(target_pose, x, y, z, rx=0, ry=0, rz=0):
@@ -201,15 +254,19 @@ def RelTool(target_pose, x, y, z, rx=0, ry=0, rz=0):
 
     .. seealso:: :func:`~robodk.robomath.Offset`, :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.roty`, :func:`~robodk.robomath.rotz`
     """
-    if type(target_pose) != Mat:
+    if not isinstance(target_pose, Mat):
         target_pose = target_pose.Pose()
-    new_target = target_pose * transl(x, y, z) * rotx(rx * pi / 180) * roty(ry * pi / 180) * rotz(rz * pi / 180)
+    if len(target_pose.rows[0]) != 4:
+        # Let the generic product report the size mismatch
+        return target_pose * Pose(x, y, z, rx, ry, rz)
+    new_target = Mat._from_rows_unsafe(_mult_by_pose(target_pose.rows, Pose(x, y, z, rx, ry, rz).rows))
     return new_target
 
 
 def Offset(target_pose, x, y, z, rx=0, ry=0, rz=0):
     """Calculates a relative target with respect to the reference frame coordinates.
     X,Y,Z are in mm, RX,RY,RZ are in degrees.
+    The target pose must be homogeneous. This is checked unless SKIP_HOMOGENEOUS_CHECK is set to True.
 
     :param :class:`.Mat` target_pose: Reference pose
     :param float x: translation along the Reference X axis (mm)
@@ -221,61 +278,96 @@ def Offset(target_pose, x, y, z, rx=0, ry=0, rz=0):
 
     .. seealso:: :func:`~robodk.robomath.RelTool`, :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.roty`, :func:`~robodk.robomath.rotz`
     """
-    if type(target_pose) != Mat:
+    if not isinstance(target_pose, Mat):
         # item object assumed:
         target_pose = target_pose.Pose()
-    if not target_pose.isHomogeneous():
+    if not SKIP_HOMOGENEOUS_CHECK and not target_pose.isHomogeneous():
         raise Exception(MatrixError, "Pose matrix is not homogeneous!")
-    new_target = transl(x, y, z) * rotx(rx * pi / 180.0) * roty(ry * pi / 180.0) * rotz(rz * pi / 180.0) * target_pose
+    new_target = Mat._from_rows_unsafe(_pose_mult(Pose(x, y, z, rx, ry, rz).rows, target_pose.rows))
     return new_target
 
 
+def _mult4x4(rows_a, rows_b):
+    """Returns the rows of the product of two 4x4 matrices given as lists of rows (fully unrolled)"""
+    (a00, a01, a02, a03), (a10, a11, a12, a13), (a20, a21, a22, a23), (a30, a31, a32, a33) = rows_a
+    (b00, b01, b02, b03), (b10, b11, b12, b13), (b20, b21, b22, b23), (b30, b31, b32, b33) = rows_b
+    return [[a00 * b00 + a01 * b10 + a02 * b20 + a03 * b30, a00 * b01 + a01 * b11 + a02 * b21 + a03 * b31, a00 * b02 + a01 * b12 + a02 * b22 + a03 * b32, a00 * b03 + a01 * b13 + a02 * b23 + a03 * b33],
+            [a10 * b00 + a11 * b10 + a12 * b20 + a13 * b30, a10 * b01 + a11 * b11 + a12 * b21 + a13 * b31, a10 * b02 + a11 * b12 + a12 * b22 + a13 * b32, a10 * b03 + a11 * b13 + a12 * b23 + a13 * b33],
+            [a20 * b00 + a21 * b10 + a22 * b20 + a23 * b30, a20 * b01 + a21 * b11 + a22 * b21 + a23 * b31, a20 * b02 + a21 * b12 + a22 * b22 + a23 * b32, a20 * b03 + a21 * b13 + a22 * b23 + a23 * b33],
+            [a30 * b00 + a31 * b10 + a32 * b20 + a33 * b30, a30 * b01 + a31 * b11 + a32 * b21 + a33 * b31, a30 * b02 + a31 * b12 + a32 * b22 + a33 * b32, a30 * b03 + a31 * b13 + a32 * b23 + a33 * b33]]
+
+
+def _mult_by_pose(a, pose):
+    """Returns the rows of the product a*pose, where a is a list of rows of 4 elements and pose is the list of rows of a 4x4 pose with the last row [0,0,0,1].
+    The products with the constant last row of the pose are skipped: 36 multiplications instead of 64 for a 4x4 matrix."""
+    (p00, p01, p02, p03), (p10, p11, p12, p13), (p20, p21, p22, p23) = pose[0], pose[1], pose[2]
+    return [[a0 * p00 + a1 * p10 + a2 * p20, a0 * p01 + a1 * p11 + a2 * p21, a0 * p02 + a1 * p12 + a2 * p22, a0 * p03 + a1 * p13 + a2 * p23 + a3] for a0, a1, a2, a3 in a]
+
+
+def _pose_mult(pose, b):
+    """Returns the rows of the product pose*b, where pose is the list of rows of a 4x4 pose with the last row [0,0,0,1] and b is the list of rows of a 4x4 matrix.
+    The last row of the product is the last row of b, so only the first 3 rows are computed: 48 multiplications instead of 64."""
+    cols = list(zip(*b))
+    return [[p0 * c0 + p1 * c1 + p2 * c2 + p3 * c3 for c0, c1, c2, c3 in cols] for p0, p1, p2, p3 in pose[:3]] + [list(b[3])]
+
+
+def _invH_rows(rows):
+    """Returns the rows of the inverse of a homogeneous 4x4 pose given as a list of rows: the rotation is transposed and the position is -R^T*t. The last value of the last row is kept as is."""
+    (r00, r01, r02, tx), (r10, r11, r12, ty), (r20, r21, r22, tz) = rows[0], rows[1], rows[2]
+    return [[r00, r10, r20, -(r00 * tx + r10 * ty + r20 * tz)], [r01, r11, r21, -(r01 * tx + r11 * ty + r21 * tz)], [r02, r12, r22, -(r02 * tx + r12 * ty + r22 * tz)], [0, 0, 0, rows[3][3]]]
+
+
+def _is_parallel3(a, b):
+    """Returns True if two 3D vectors are parallel or opposite within 0.03 rad. Same test as abs(angle3(a, b)) < 0.03 or abs(abs(angle3(a, b)) - pi) < 0.03, without normalizing the vectors or calling acos."""
+    d = a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+    return d * d > _COS_PARALLEL_SQ * (a[0] * a[0] + a[1] * a[1] + a[2] * a[2]) * (b[0] * b[0] + b[1] * b[1] + b[2] * b[2])
+
+
+def _cross_normalize3(a, b):
+    """Returns the unitary vector of the cross product of two 3D vectors (same as normalize3(cross(a, b)))"""
+    x = a[1] * b[2] - a[2] * b[1]
+    y = a[2] * b[0] - a[0] * b[2]
+    z = a[0] * b[1] - a[1] * b[0]
+    norminv = 1.0 / _sqrt(x * x + y * y + z * z)
+    return [x * norminv, y * norminv, z * norminv]
+
+
+def _axes_2_pose(point, vx, vy, vz):
+    """Returns the pose with the given origin and unitary X, Y and Z axes"""
+    return Mat._from_rows_unsafe([[vx[0], vy[0], vz[0], point[0]], [vx[1], vy[1], vz[1], point[1]], [vx[2], vy[2], vz[2], point[2]], [0, 0, 0, 1]])
+
+
 def point_Xaxis_2_pose(point, xaxis, zaxis_hint1=[0, 0, -1], zaxis_hint2=[0, -1, 0]):
     """Returns a pose given the origin as a point, a X axis and a preferred orientation for the Z axis"""
-    pose = eye(4)
-    pose.setPos(point)
-    pose.setVX(xaxis)
+    xaxis = normalize3(xaxis)
     zaprox = zaxis_hint1
-    delta = abs(angle3(xaxis, zaprox))
-    if delta < 0.03 or abs(delta - pi) < 0.03:
+    if _is_parallel3(xaxis, zaprox):
         zaprox = zaxis_hint2
-    yaxis = normalize3(cross(zaprox, xaxis))
+    yaxis = _cross_normalize3(zaprox, xaxis)
     zaxis = cross(xaxis, yaxis)
-    pose.setVY(yaxis)
-    pose.setVZ(zaxis)
-    return pose
+    return _axes_2_pose(point, xaxis, yaxis, zaxis)
 
 
 def point_Yaxis_2_pose(point, yaxis, zaxis_hint1=[0, 0, -1], zaxis_hint2=[-1, 0, 0]):
     """Returns a pose given the origin as a point, a Y axis and a preferred orientation for the Z axis"""
-    pose = eye(4)
-    pose.setPos(point)
-    pose.setVY(yaxis)
+    yaxis = normalize3(yaxis)
     zaprox = zaxis_hint1
-    delta = abs(angle3(yaxis, zaprox))
-    if delta < 0.03 or abs(delta - pi) < 0.03:
+    if _is_parallel3(yaxis, zaprox):
         zaprox = zaxis_hint2
-    xaxis = normalize3(cross(yaxis, zaprox))
+    xaxis = _cross_normalize3(yaxis, zaprox)
     zaxis = cross(xaxis, yaxis)
-    pose.setVX(xaxis)
-    pose.setVZ(zaxis)
-    return pose
+    return _axes_2_pose(point, xaxis, yaxis, zaxis)
 
 
 def point_Zaxis_2_pose(point, zaxis, yaxis_hint1=[0, 0, 1], yaxis_hint2=[0, 1, 1]):
     """Returns a pose given the origin as a point, a Z axis and a preferred orientation for the Y axis"""
-    pose = eye(4)
-    pose.setPos(point)
-    pose.setVZ(zaxis)
+    zaxis = normalize3(zaxis)
     yaprox = yaxis_hint1
-    delta = abs(angle3(zaxis, yaprox))
-    if delta < 0.03 or abs(delta - pi) < 0.03:
+    if _is_parallel3(zaxis, yaprox):
         yaprox = yaxis_hint2
-    xaxis = normalize3(cross(yaprox, zaxis))
+    xaxis = _cross_normalize3(yaprox, zaxis)
     yaxis = cross(zaxis, xaxis)
-    pose.setVX(xaxis)
-    pose.setVY(yaxis)
-    return pose
+    return _axes_2_pose(point, xaxis, yaxis, zaxis)
 
 
 def eye(size=4):
@@ -294,11 +386,11 @@ def eye(size=4):
     .. seealso:: :func:`~robodk.robomath.transl`, :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.roty`, :func:`~robodk.robomath.rotz`
     """
     if size == 4:
-        return Mat([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+        return Mat._from_rows_unsafe([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
     else:
         newmat = Mat(size, size)
         for i in range(size):
-            newmat[i, i] = 1
+            newmat.rows[i][i] = 1
         return newmat
 
 
@@ -333,6 +425,26 @@ def invH(matrix):
     return matrix.invH()
 
 
+def rel_pose(pose1, pose2):
+    """Returns the pose of pose2 relative to pose1. Same as invH(pose1)*pose2, without calculating the inverse as a separate matrix.
+
+    :param pose1: reference pose (must be homogeneous)
+    :type pose1: :class:`.Mat`
+    :param pose2: pose
+    :type pose2: :class:`.Mat`
+
+    .. seealso:: :func:`~robodk.robomath.invH`
+    """
+    if not SKIP_HOMOGENEOUS_CHECK and not pose1.isHomogeneous():
+        raise Exception(MatrixError, "Pose matrix is not homogeneous. invH() can only compute the inverse of a homogeneous matrix")
+    rows = _pose_mult(_invH_rows(pose1.rows), pose2.rows)
+    w = pose1.rows[3][3]
+    if w != 1:
+        # The last row of invH(pose1) is [0,0,0,w]: scale the last row of pose2 (not normalized pose1)
+        rows[3] = [w * value for value in rows[3]]
+    return Mat._from_rows_unsafe(rows)
+
+
 def catV(mat1, mat2):
     """Concatenate 2 matrices (vertical concatenation)"""
     return mat1.catV(mat2)
@@ -345,40 +457,38 @@ def catH(mat1, mat2):
 
 def tic():
     """Start a stopwatch timer"""
-    import time
     global TICTOC_START_TIME
-    TICTOC_START_TIME = time.time()
+    TICTOC_START_TIME = _timer()
 
 
 def toc():
     """Read the stopwatch timer"""
-    import time
-    if 'TICTOC_START_TIME' in globals():
-        elapsed = time.time() - TICTOC_START_TIME
-        #print("Elapsed time is " + str(elapsed) + " seconds.")
-        return elapsed
-    else:
+    try:
+        elapsed = _timer() - TICTOC_START_TIME
+    except NameError:
         print("Toc: start time not set")
         return -1
+    #print("Elapsed time is " + str(elapsed) + " seconds.")
+    return elapsed
 
 
 #----------------------------------------------------
 #------ Pose to xyzrpw and xyzrpw to pose------------
+def _compose_TRzyx(x, y, z, srz, crz, sry, cry, srx, crx):
+    """Returns transl(x,y,z)*rotz(rz)*roty(ry)*rotx(rx) as a single closed-form matrix, given the sine and cosine of each angle.
+    Shared by PosePP/KUKA_2_Pose and xyzrpw_2_pose (and the Motoman/Fanuc/Techman converters), which only differ in the order of the angles."""
+    return Mat._from_rows_unsafe([[cry * crz, crz * srx * sry - crx * srz, srx * srz + crx * crz * sry, x], [cry * srz, crx * crz + srx * sry * srz, crx * sry * srz - crz * srx, y], [-sry, cry * srx, crx * cry, z], [0.0, 0.0, 0.0, 1.0]])
+
+
 def PosePP(x, y, z, r, p, w):
     """Create a pose from XYZRPW coordinates. The pose format is the one used by KUKA (XYZABC coordinates). This is function is the same as KUKA_2_Pose (with the difference that the input values are not a list). This function is used as "p" by the intermediate file when generating a robot program.
 
     .. seealso:: :func:`~robodk.robomath.KUKA_2_Pose`, :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    a = r * math.pi / 180.0
-    b = p * math.pi / 180.0
-    c = w * math.pi / 180.0
-    ca = math.cos(a)
-    sa = math.sin(a)
-    cb = math.cos(b)
-    sb = math.sin(b)
-    cc = math.cos(c)
-    sc = math.sin(c)
-    return Mat([[cb * ca, ca * sc * sb - cc * sa, sc * sa + cc * ca * sb, x], [cb * sa, cc * ca + sc * sb * sa, cc * sb * sa - ca * sc, y], [-sb, cb * sc, cc * cb, z], [0.0, 0.0, 0.0, 1.0]])
+    sa, ca = _sin_cos_deg(r)
+    sb, cb = _sin_cos_deg(p)
+    sc, cc = _sin_cos_deg(w)
+    return _compose_TRzyx(x, y, z, sa, ca, sb, cb, sc, cc)
 
 
 def pose_2_xyzrpw(H):
@@ -392,22 +502,23 @@ def pose_2_xyzrpw(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if (H[2, 0] > (1.0 - 1e-10)):
-        p = -pi / 2
+    rows = H.rows
+    x = rows[0][3]
+    y = rows[1][3]
+    z = rows[2][3]
+    if (rows[2][0] > (1.0 - 1e-10)):
+        p = -_HALF_PI
         r = 0
-        w = math.atan2(-H[1, 2], H[1, 1])
-    elif H[2, 0] < -1.0 + 1e-10:
-        p = pi / 2
+        w = _atan2(-rows[1][2], rows[1][1])
+    elif rows[2][0] < -1.0 + 1e-10:
+        p = _HALF_PI
         r = 0
-        w = math.atan2(H[1, 2], H[1, 1])
+        w = _atan2(rows[1][2], rows[1][1])
     else:
-        p = math.atan2(-H[2, 0], sqrt(H[0, 0] * H[0, 0] + H[1, 0] * H[1, 0]))
-        w = math.atan2(H[1, 0], H[0, 0])
-        r = math.atan2(H[2, 1], H[2, 2])
-    return [x, y, z, r * 180 / pi, p * 180 / pi, w * 180 / pi]
+        p = _atan2(-rows[2][0], _hypot(rows[0][0], rows[1][0]))
+        w = _atan2(rows[1][0], rows[0][0])
+        r = _atan2(rows[2][1], rows[2][2])
+    return [x, y, z, r * _R2D, p * _R2D, w * _R2D]
 
 
 def xyzrpw_2_pose(xyzrpw):
@@ -417,17 +528,16 @@ def xyzrpw_2_pose(xyzrpw):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     [x, y, z, r, p, w] = xyzrpw
-    a = r * pi / 180
-    b = p * pi / 180
-    c = w * pi / 180
-    ca = math.cos(a)
-    sa = math.sin(a)
-    cb = math.cos(b)
-    sb = math.sin(b)
-    cc = math.cos(c)
-    sc = math.sin(c)
-    H = Mat([[cb * cc, cc * sa * sb - ca * sc, sa * sc + ca * cc * sb, x], [cb * sc, ca * cc + sa * sb * sc, ca * sb * sc - cc * sa, y], [-sb, cb * sa, ca * cb, z], [0, 0, 0, 1]])
-    return H
+    sa, ca = _sin_cos_deg(r)
+    sb, cb = _sin_cos_deg(p)
+    sc, cc = _sin_cos_deg(w)
+    return _compose_TRzyx(x, y, z, sc, cc, sb, cb, sa, ca)
+
+
+def _compose_TRxyz(x, y, z, srx, crx, sry, cry, srz, crz):
+    """Returns transl(x,y,z)*rotx(rx)*roty(ry)*rotz(rz) as a single closed-form matrix, given the sine and cosine of each angle.
+    Shared by Pose and TxyzRxyz_2_Pose to avoid building and multiplying intermediate matrices."""
+    return Mat._from_rows_unsafe([[cry * crz, -cry * srz, sry, x], [crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y], [srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z], [0, 0, 0, 1]])
 
 
 def Pose(x, y, z, rxd, ryd, rzd):
@@ -444,16 +554,10 @@ def Pose(x, y, z, rxd, ryd, rzd):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`
     """
-    rx = rxd * pi / 180
-    ry = ryd * pi / 180
-    rz = rzd * pi / 180
-    srx = math.sin(rx)
-    crx = math.cos(rx)
-    sry = math.sin(ry)
-    cry = math.cos(ry)
-    srz = math.sin(rz)
-    crz = math.cos(rz)
-    return Mat([[cry * crz, -cry * srz, sry, x], [crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y], [srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z], [0, 0, 0, 1]])
+    srx, crx = _sin_cos_deg(rxd)
+    sry, cry = _sin_cos_deg(ryd)
+    srz, crz = _sin_cos_deg(rzd)
+    return _compose_TRxyz(x, y, z, srx, crx, sry, cry, srz, crz)
 
 
 def TxyzRxyz_2_Pose(xyzrpw):
@@ -466,14 +570,10 @@ def TxyzRxyz_2_Pose(xyzrpw):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     [x, y, z, rx, ry, rz] = xyzrpw
-    srx = math.sin(rx)
-    crx = math.cos(rx)
-    sry = math.sin(ry)
-    cry = math.cos(ry)
-    srz = math.sin(rz)
-    crz = math.cos(rz)
-    H = Mat([[cry * crz, -cry * srz, sry, x], [crx * srz + crz * srx * sry, crx * crz - srx * sry * srz, -cry * srx, y], [srx * srz - crx * crz * sry, crz * srx + crx * sry * srz, crx * cry, z], [0, 0, 0, 1]])
-    return H
+    srx, crx = _sin_cos(rx)
+    sry, cry = _sin_cos(ry)
+    srz, crz = _sin_cos(rz)
+    return _compose_TRxyz(x, y, z, srx, crx, sry, cry, srz, crz)
 
 
 def Pose_2_TxyzRxyz(H):
@@ -486,32 +586,33 @@ def Pose_2_TxyzRxyz(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    a = H[0, 0]
-    b = H[0, 1]
-    c = H[0, 2]
-    d = H[1, 2]
-    e = H[2, 2]
+    rows = H.rows
+    x = rows[0][3]
+    y = rows[1][3]
+    z = rows[2][3]
+    a = rows[0][0]
+    b = rows[0][1]
+    c = rows[0][2]
+    d = rows[1][2]
+    e = rows[2][2]
     if c > (1.0 - 1e-10):
-        ry1 = pi / 2
+        ry1 = _HALF_PI
         rx1 = 0
-        rz1 = atan2(H[1, 0], H[1, 1])
+        rz1 = _atan2(rows[1][0], rows[1][1])
     elif c < (-1.0 + 1e-10):
-        ry1 = -pi / 2
+        ry1 = -_HALF_PI
         rx1 = 0
-        rz1 = atan2(H[1, 0], H[1, 1])
+        rz1 = _atan2(rows[1][0], rows[1][1])
     else:
         sy = c
-        cy1 = +sqrt(1 - sy * sy)
+        cy1 = +_sqrt(1 - sy * sy)
         sx1 = -d / cy1
         cx1 = e / cy1
         sz1 = -b / cy1
         cz1 = a / cy1
-        rx1 = atan2(sx1, cx1)
-        ry1 = atan2(sy, cy1)
-        rz1 = atan2(sz1, cz1)
+        rx1 = _atan2(sx1, cx1)
+        ry1 = _atan2(sy, cy1)
+        rz1 = _atan2(sz1, cz1)
     return [x, y, z, rx1, ry1, rz1]
 
 
@@ -523,11 +624,8 @@ def Pose_2_Staubli(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    xyzwpr = Pose_2_TxyzRxyz(H)
-    xyzwpr[3] = xyzwpr[3] * 180.0 / pi
-    xyzwpr[4] = xyzwpr[4] * 180.0 / pi
-    xyzwpr[5] = xyzwpr[5] * 180.0 / pi
-    return xyzwpr
+    x, y, z, rx, ry, rz = Pose_2_TxyzRxyz(H)
+    return [x, y, z, rx * _R2D, ry * _R2D, rz * _R2D]
 
 
 def Pose_2_Motoman(H):
@@ -538,8 +636,7 @@ def Pose_2_Motoman(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    xyzwpr = pose_2_xyzrpw(H)
-    return xyzwpr
+    return pose_2_xyzrpw(H)
 
 
 def Pose_2_Fanuc(H):
@@ -550,8 +647,7 @@ def Pose_2_Fanuc(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    xyzwpr = pose_2_xyzrpw(H)
-    return xyzwpr
+    return pose_2_xyzrpw(H)
 
 
 def Pose_2_Techman(H):
@@ -562,8 +658,7 @@ def Pose_2_Techman(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    xyzwpr = pose_2_xyzrpw(H)
-    return xyzwpr
+    return pose_2_xyzrpw(H)
 
 
 def Motoman_2_Pose(xyzwpr):
@@ -598,22 +693,23 @@ def Pose_2_KUKA(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if (H[2, 0]) > (1.0 - 1e-10):
-        p = -pi / 2
+    rows = H.rows
+    x = rows[0][3]
+    y = rows[1][3]
+    z = rows[2][3]
+    if (rows[2][0]) > (1.0 - 1e-10):
+        p = -_HALF_PI
         r = 0
-        w = atan2(-H[1, 2], H[1, 1])
-    elif (H[2, 0]) < (-1.0 + 1e-10):
-        p = pi / 2
+        w = _atan2(-rows[1][2], rows[1][1])
+    elif (rows[2][0]) < (-1.0 + 1e-10):
+        p = _HALF_PI
         r = 0
-        w = atan2(H[1, 2], H[1, 1])
+        w = _atan2(rows[1][2], rows[1][1])
     else:
-        p = atan2(-H[2, 0], sqrt(H[0, 0] * H[0, 0] + H[1, 0] * H[1, 0]))
-        w = atan2(H[1, 0], H[0, 0])
-        r = atan2(H[2, 1], H[2, 2])
-    return [x, y, z, w * 180 / pi, p * 180 / pi, r * 180 / pi]
+        p = _atan2(-rows[2][0], _hypot(rows[0][0], rows[1][0]))
+        w = _atan2(rows[1][0], rows[0][0])
+        r = _atan2(rows[2][1], rows[2][2])
+    return [x, y, z, w * _R2D, p * _R2D, r * _R2D]
 
 
 def KUKA_2_Pose(xyzrpw):
@@ -622,16 +718,7 @@ def KUKA_2_Pose(xyzrpw):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     [x, y, z, r, p, w] = xyzrpw
-    a = r * math.pi / 180.0
-    b = p * math.pi / 180.0
-    c = w * math.pi / 180.0
-    ca = math.cos(a)
-    sa = math.sin(a)
-    cb = math.cos(b)
-    sb = math.sin(b)
-    cc = math.cos(c)
-    sc = math.sin(c)
-    return Mat([[cb * ca, ca * sc * sb - cc * sa, sc * sa + cc * ca * sb, x], [cb * sa, cc * ca + sc * sb * sa, cc * sb * sa - ca * sc, y], [-sb, cb * sc, cc * cb, z], [0.0, 0.0, 0.0, 1.0]])
+    return PosePP(x, y, z, r, p, w)
 
 
 def Adept_2_Pose(xyzrpw):
@@ -640,16 +727,10 @@ def Adept_2_Pose(xyzrpw):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     [x, y, z, r, p, w] = xyzrpw
-    a = r * math.pi / 180.0
-    b = p * math.pi / 180.0
-    c = w * math.pi / 180.0
-    ca = math.cos(a)
-    sa = math.sin(a)
-    cb = math.cos(b)
-    sb = math.sin(b)
-    cc = math.cos(c)
-    sc = math.sin(c)
-    return Mat([[ca * cb * cc - sa * sc, -cc * sa - ca * cb * sc, ca * sb, x], [ca * sc + cb * cc * sa, ca * cc - cb * sa * sc, sa * sb, y], [-cc * sb, sb * sc, cb, z], [0.0, 0.0, 0.0, 1.0]])
+    sa, ca = _sin_cos_deg(r)
+    sb, cb = _sin_cos_deg(p)
+    sc, cc = _sin_cos_deg(w)
+    return Mat._from_rows_unsafe([[ca * cb * cc - sa * sc, -cc * sa - ca * cb * sc, ca * sb, x], [ca * sc + cb * cc * sa, ca * cc - cb * sa * sc, sa * sb, y], [-cc * sb, sb * sc, cb, z], [0.0, 0.0, 0.0, 1.0]])
 
 
 def Pose_2_Adept(H):
@@ -660,28 +741,29 @@ def Pose_2_Adept(H):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    x = H[0, 3]
-    y = H[1, 3]
-    z = H[2, 3]
-    if H[2, 2] > (1.0 - 1e-10):
+    rows = H.rows
+    x = rows[0][3]
+    y = rows[1][3]
+    z = rows[2][3]
+    if rows[2][2] > (1.0 - 1e-10):
         r = 0
         p = 0
-        w = atan2(H[1, 0], H[0, 0])
-    elif H[2, 2] < (-1.0 + 1e-10):
+        w = _atan2(rows[1][0], rows[0][0])
+    elif rows[2][2] < (-1.0 + 1e-10):
         r = 0
         p = pi
-        w = atan2(H[1, 0], H[1, 1])
+        w = _atan2(rows[1][0], rows[1][1])
     else:
-        cb = H[2, 2]
-        sb = +sqrt(1 - cb * cb)
-        sc = H[2, 1] / sb
-        cc = -H[2, 0] / sb
-        sa = H[1, 2] / sb
-        ca = H[0, 2] / sb
-        r = atan2(sa, ca)
-        p = atan2(sb, cb)
-        w = atan2(sc, cc)
-    return [x, y, z, r * 180 / pi, p * 180 / pi, w * 180 / pi]
+        cb = rows[2][2]
+        sb = +_sqrt(1 - cb * cb)
+        sc = rows[2][1] / sb
+        cc = -rows[2][0] / sb
+        sa = rows[1][2] / sb
+        ca = rows[0][2] / sb
+        r = _atan2(sa, ca)
+        p = _atan2(sb, cb)
+        w = _atan2(sc, cc)
+    return [x, y, z, r * _R2D, p * _R2D, w * _R2D]
 
 
 def Comau_2_Pose(xyzrpw):
@@ -733,7 +815,8 @@ def pose_2_quaternion(Ti):
     TOLERANCE_0 = 1e-9
     TOLERANCE_180 = 1e-7
 
-    cosangle = min(max(((Ti[0, 0] + Ti[1, 1] + Ti[2, 2] - 1.0) * 0.5), -1.0), 1.0)  # Calculate the rotation angle
+    (a, r01, r02), (r10, b, r12), (r20, r21, c) = Ti.rows[0][:3], Ti.rows[1][:3], Ti.rows[2][:3]
+    cosangle = min(max(((a + b + c - 1.0) * 0.5), -1.0), 1.0)  # Calculate the rotation angle
     if cosangle > 1.0 - TOLERANCE_0:
         # Identity matrix
         q1 = 1.0
@@ -743,9 +826,9 @@ def pose_2_quaternion(Ti):
 
     elif cosangle < -1.0 + TOLERANCE_180:
         # 180 rotation around an axis
-        diag = [Ti[0, 0], Ti[1, 1], Ti[2, 2]]
+        diag = [a, b, c]
         k = diag.index(max(diag))
-        col = [Ti[0, k], Ti[1, k], Ti[2, k]]
+        col = [Ti.rows[0][k], Ti.rows[1][k], Ti.rows[2][k]]
         col[k] = col[k] + 1.0
         rotvector = [n / sqrtA(2.0 * (1.0 + diag[k])) for n in col]
 
@@ -755,30 +838,48 @@ def pose_2_quaternion(Ti):
         q4 = rotvector[2]
 
     else:
-        # No edge case, normal calculation
-        a = Ti[0, 0]
-        b = Ti[1, 1]
-        c = Ti[2, 2]
-        sign2 = 1.0
-        sign3 = 1.0
-        sign4 = 1.0
-        if Ti[2, 1] - Ti[1, 2] < 0.0:
-            sign2 = -1.0
-        if Ti[0, 2] - Ti[2, 0] < 0.0:
-            sign3 = -1.0
-        if Ti[1, 0] - Ti[0, 1] < 0.0:
-            sign4 = -1.0
-        q1 =         sqrt(max( a + b + c + 1.0, 0.0)) / 2.0
-        q2 = sign2 * sqrt(max( a - b - c + 1.0, 0.0)) / 2.0
-        q3 = sign3 * sqrt(max(-a + b - c + 1.0, 0.0)) / 2.0
-        q4 = sign4 * sqrt(max(-a - b + c + 1.0, 0.0)) / 2.0
+        # No edge case, normal calculation (Shepperd's method)
+        # Only the largest quaternion component is computed with a square root, the others are derived from it
+        trace = a + b + c
+        if trace >= a and trace >= b and trace >= c:
+            s = 2.0 * _sqrt(trace + 1.0)
+            q1 = 0.25 * s
+            q2 = (r21 - r12) / s
+            q3 = (r02 - r20) / s
+            q4 = (r10 - r01) / s
+        else:
+            if a >= b and a >= c:
+                s = 2.0 * _sqrt(a - b - c + 1.0)
+                q1 = (r21 - r12) / s
+                q2 = 0.25 * s
+                q3 = (r01 + r10) / s
+                q4 = (r02 + r20) / s
+            elif b >= c:
+                s = 2.0 * _sqrt(-a + b - c + 1.0)
+                q1 = (r02 - r20) / s
+                q2 = (r01 + r10) / s
+                q3 = 0.25 * s
+                q4 = (r12 + r21) / s
+            else:
+                s = 2.0 * _sqrt(-a - b + c + 1.0)
+                q1 = (r10 - r01) / s
+                q2 = (r02 + r20) / s
+                q3 = (r12 + r21) / s
+                q4 = 0.25 * s
+
+            # Keep the scalar component positive
+            if q1 < 0.0:
+                q1 = -q1
+                q2 = -q2
+                q3 = -q3
+                q4 = -q4
 
     return [q1, q2, q3, q4]
 
 
 def Pose_Split(pose1, pose2, delta_mm=1.0):
     """Create a sequence of poses that transitions from pose1 to pose2 by steps of delta_mm in mm (the first and last pose are not included in the list)"""
-    pose_delta = invH(pose1) * pose2
+    pose_delta = rel_pose(pose1, pose2)
     distance = norm(pose_delta.Pos())
     if distance <= delta_mm:
         return [pose2]
@@ -792,16 +893,47 @@ def Pose_Split(pose1, pose2, delta_mm=1.0):
     xd = x / steps
     yd = y / steps
     zd = z / steps
-    wd = w / steps
-    pd = p / steps
-    rd = r / steps
-    for i in range(steps - 1):
-        factor = i + 1
-        pose_list.append(pose1 * UR_2_Pose([xd * factor, yd * factor, zd * factor, wd * factor, pd * factor, rd * factor]))
+
+    # All intermediate poses rotate around the same axis: calculate the unitary axis and the angle step once
+    angle = norm([w, p, r])
+    if angle == 0.0:
+        kx = ky = kz = 0.0
+    else:
+        kx = w / angle
+        ky = p / angle
+        kz = r / angle
+    kxx, kyy, kzz, kxy, kxz, kyz = kx * kx, ky * ky, kz * kz, kx * ky, kx * kz, ky * kz
+    angle_d = angle / steps
+
+    rows1 = pose1.rows
+    for factor in range(1, steps):
+        # Same as UR_2_Pose([xd*factor, yd*factor, zd*factor, ...]) using the axis-angle (Rodrigues) formula
+        s, c = _sin_cos(angle_d * factor)
+        v = 1.0 - c
+        H = [[c + kxx * v, kxy * v - kz * s, kxz * v + ky * s, xd * factor], [kxy * v + kz * s, c + kyy * v, kyz * v - kx * s, yd * factor], [kxz * v - ky * s, kyz * v + kx * s, c + kzz * v, zd * factor]]
+        pose_list.append(Mat._from_rows_unsafe(_mult_by_pose(rows1, H)))
 
     return pose_list
 
 
+def _unit_quaternion_2_pose(q1, q2, q3, q4, x=0, y=0, z=0):
+    """Returns the pose given a unitary quaternion [q1,q2,q3,q4] and a position [x,y,z]"""
+    # Shared products (scaling by 2 is exact)
+    xx = 2 * q2 * q2
+    yy = 2 * q3 * q3
+    zz = 2 * q4 * q4
+    xy = 2 * q2 * q3
+    xz = 2 * q2 * q4
+    yz = 2 * q3 * q4
+    wx = 2 * q2 * q1
+    wy = 2 * q3 * q1
+    wz = 2 * q4 * q1
+    return Mat._from_rows_unsafe([[1 - yy - zz, xy - wz,     xz + wy,     x],
+                                  [xy + wz,     1 - xx - zz, yz - wx,     y],
+                                  [xz - wy,     yz + wx,     1 - xx - yy, z],
+                                  [0,           0,           0,           1]])
+
+
 def quaternion_2_pose(qin):
     """Returns the pose orientation matrix (4x4 matrix) given a quaternion orientation vector
 
@@ -809,17 +941,9 @@ def quaternion_2_pose(qin):
 
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
-    qnorm = sqrt(qin[0] * qin[0] + qin[1] * qin[1] + qin[2] * qin[2] + qin[3] * qin[3])
-    q = qin
-    q[0] = q[0] / qnorm
-    q[1] = q[1] / qnorm
-    q[2] = q[2] / qnorm
-    q[3] = q[3] / qnorm
-    pose = Mat([[1 - 2*q[2]*q[2] - 2*q[3]*q[3], 2*q[1]*q[2] - 2*q[3]*q[0],     2*q[1]*q[3] + 2*q[2]*q[0],     0],
-                [2*q[1]*q[2] + 2*q[3]*q[0],     1 - 2*q[1]*q[1] - 2*q[3]*q[3], 2*q[2]*q[3] - 2*q[1]*q[0],     0],
-                [2*q[1]*q[3] - 2*q[2]*q[0],     2*q[2]*q[3] + 2*q[1]*q[0],     1 - 2*q[1]*q[1] - 2*q[2]*q[2], 0],
-                [0,                             0,                             0,                             1]])
-    return pose
+    q1, q2, q3, q4 = qin[0], qin[1], qin[2], qin[3]
+    inv_norm = 1.0 / _sqrt(q1 * q1 + q2 * q2 + q3 * q3 + q4 * q4)
+    return _unit_quaternion_2_pose(q1 * inv_norm, q2 * inv_norm, q3 * inv_norm, q4 * inv_norm)
 
 
 def Pose_2_ABB(H):
@@ -831,7 +955,8 @@ def Pose_2_ABB(H):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     q = pose_2_quaternion(H)
-    return [H[0, 3], H[1, 3], H[2, 3], q[0], q[1], q[2], q[3]]
+    rows = H.rows
+    return [rows[0][3], rows[1][3], rows[2][3], q[0], q[1], q[2], q[3]]
 
 
 def print_pose_ABB(pose):
@@ -843,7 +968,8 @@ def print_pose_ABB(pose):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`, :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_ABB`, :func:`~robodk.robomath.Pose_2_Adept`, :func:`~robodk.robomath.Pose_2_Comau`, :func:`~robodk.robomath.Pose_2_Fanuc`, :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.Pose_2_Motoman`, :func:`~robodk.robomath.Pose_2_Nachi`, :func:`~robodk.robomath.Pose_2_Staubli`, :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.quaternion_2_pose`
     """
     q = pose_2_quaternion(pose)
-    print('[[%.3f,%.3f,%.3f],[%.6f,%.6f,%.6f,%.6f]]' % (pose[0, 3], pose[1, 3], pose[2, 3], q[0], q[1], q[2], q[3]))
+    rows = pose.rows
+    print('[[%.3f,%.3f,%.3f],[%.6f,%.6f,%.6f,%.6f]]' % (rows[0][3], rows[1][3], rows[2][3], q[0], q[1], q[2], q[3]))
 
 
 def Pose_2_UR(pose):
@@ -853,31 +979,32 @@ def Pose_2_UR(pose):
     """
     NUMERIC_TOLERANCE = 1e-8
 
-    def saturate_1(value):
-        return min(max(value, -1.0), 1.0)
-
-    angle = acos(saturate_1((pose[0, 0] + pose[1, 1] + pose[2, 2] - 1) * 0.5))
-    rxyz = [pose[2, 1] - pose[1, 2], pose[0, 2] - pose[2, 0], pose[1, 0] - pose[0, 1]]
+    rows = pose.rows
+    angle = _acos(min(max((rows[0][0] + rows[1][1] + rows[2][2] - 1) * 0.5, -1.0), 1.0))
+    rxyz = [rows[2][1] - rows[1][2], rows[0][2] - rows[2][0], rows[1][0] - rows[0][1]]
     if angle < NUMERIC_TOLERANCE:
         rxyz = [0, 0, 0]
     else:
-        sin_angle = sin(angle)
-        if abs(sin_angle) < NUMERIC_TOLERANCE or norm(rxyz) < NUMERIC_TOLERANCE:
-            d3 = [pose[0, 0], pose[1, 1], pose[2, 2]]
+        sin_angle = _sin(angle)
+        rnorm = _sqrt(rxyz[0] * rxyz[0] + rxyz[1] * rxyz[1] + rxyz[2] * rxyz[2])
+        if abs(sin_angle) < NUMERIC_TOLERANCE or rnorm < NUMERIC_TOLERANCE:
+            d3 = [rows[0][0], rows[1][1], rows[2][2]]
             mx = max(d3)
             mx_id = d3.index(mx)
             if mx_id == 0:
-                rxyz = [pose[0, 0] + 1, pose[1, 0], pose[2, 0]]
+                rxyz = [rows[0][0] + 1, rows[1][0], rows[2][0]]
             elif mx_id == 1:
-                rxyz = [pose[0, 1], pose[1, 1] + 1, pose[2, 1]]
+                rxyz = [rows[0][1], rows[1][1] + 1, rows[2][1]]
             else:
-                rxyz = [pose[0, 2], pose[1, 2], pose[2, 2] + 1]
+                rxyz = [rows[0][2], rows[1][2], rows[2][2] + 1]
 
-            rxyz = mult3(rxyz, angle / (sqrt(max(0, 2 * (1 + mx)))))
+            ratio = angle / (_sqrt(max(0, 2 * (1 + mx))))
+            rxyz = [rxyz[0] * ratio, rxyz[1] * ratio, rxyz[2] * ratio]
         else:
-            rxyz = normalize3(rxyz)
-            rxyz = mult3(rxyz, angle)
-    return [pose[0, 3], pose[1, 3], pose[2, 3], rxyz[0], rxyz[1], rxyz[2]]
+            # Normalize and scale by the angle in one step
+            ratio = angle / rnorm
+            rxyz = [rxyz[0] * ratio, rxyz[1] * ratio, rxyz[2] * ratio]
+    return [rows[0][3], rows[1][3], rows[2][3], rxyz[0], rxyz[1], rxyz[2]]
 
 
 def UR_2_Pose(xyzwpr):
@@ -886,20 +1013,20 @@ def UR_2_Pose(xyzwpr):
     .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.TxyzRxyz_2_Pose`
     """
     x, y, z, w, p, r = xyzwpr
-    wpr = [w, p, r]
-    angle = norm(wpr)
-    cosang = cos(0.5 * angle)
+    if w == 0 and p == 0 and r == 0:
+        # Pure translation: float rotation, same as the general case
+        return Mat._from_rows_unsafe([[1.0, 0.0, 0.0, x], [0.0, 1.0, 0.0, y], [0.0, 0.0, 1.0, z], [0, 0, 0, 1]])
 
+    angle = _sqrt(w * w + p * p + r * r)
+    cosang = _cos(0.5 * angle)
     if angle == 0.0:
-        q234 = [0.0, 0.0, 0.0]
+        # Rotation vector too small (underflow)
+        ratio = 0.0
     else:
-        ratio = sin(0.5 * angle) / angle
-        q234 = mult3(wpr, ratio)
+        ratio = _sin(0.5 * angle) / angle
 
-    q1234 = [cosang, q234[0], q234[1], q234[2]]
-    pose = quaternion_2_pose(q1234)
-    pose.setPos([x, y, z])
-    return pose
+    # The quaternion is unitary by construction: build the pose directly (no normalization, no position update)
+    return _unit_quaternion_2_pose(cosang, w * ratio, p * ratio, r * ratio, x, y, z)
 
 
 #----------------------------------------------------
@@ -914,14 +1041,14 @@ def dh(rz, tx=None, tz=None, rx=None):
     if tx is None:
         [rz, tx, tz, rx] = rz
 
-    crx = math.cos(rx)
-    srx = math.sin(rx)
-    crz = math.cos(rz)
-    srz = math.sin(rz)
-    return Mat( [[crz, -srz*crx,  srz*srx, tx*crz],
-                 [srz,  crz*crx, -crz*srx, tx*srz],
-                 [  0,      srx,      crx,     tz],
-                 [  0,        0,        0,      1]])
+    crx = _cos(rx)
+    srx = _sin(rx)
+    crz = _cos(rz)
+    srz = _sin(rz)
+    return Mat._from_rows_unsafe([[crz, -srz*crx,  srz*srx, tx*crz],
+                                  [srz,  crz*crx, -crz*srx, tx*srz],
+                                  [  0,      srx,      crx,     tz],
+                                  [  0,        0,        0,      1]])
 
 def dhm(rx, tx=None, tz=None, rz=None):
     """Returns the Denavit-Hartenberg Modified 4x4 matrix for a robot link (Craig 1986).
@@ -933,14 +1060,14 @@ def dhm(rx, tx=None, tz=None, rz=None):
     if tx is None:
         [rx, tx, tz, rz] = rx
 
-    crx = math.cos(rx)
-    srx = math.sin(rx)
-    crz = math.cos(rz)
-    srz = math.sin(rz)
-    return Mat([[crz,        -srz,    0,      tx],
-                [crx*srz, crx*crz, -srx, -tz*srx],
-                [srx*srz, crz*srx,  crx,  tz*crx],
-                [      0,       0,    0,       1]])
+    crx = _cos(rx)
+    srx = _sin(rx)
+    crz = _cos(rz)
+    srz = _sin(rz)
+    return Mat._from_rows_unsafe([[crz,        -srz,    0,      tx],
+                                  [crx*srz, crx*crz, -srx, -tz*srx],
+                                  [srx*srz, crz*srx,  crx,  tz*crx],
+                                  [      0,       0,    0,       1]])
 
 def joints_2_angles(jin, type):
     """Converts the robot encoders into angles between links depending on the type of the robot."""
@@ -992,12 +1119,12 @@ def angles_2_joints(jin, type):
 
 def norm(p):
     """Returns the norm of a 3D vector"""
-    return sqrt(p[0] * p[0] + p[1] * p[1] + p[2] * p[2])
+    return _sqrt(p[0] * p[0] + p[1] * p[1] + p[2] * p[2])
 
 
 def normalize3(a):
     """Returns the unitary vector"""
-    norminv = 1.0 / norm(a)
+    norminv = 1.0 / _sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
     return [a[0] * norminv, a[1] * norminv, a[2] * norminv]
 
 
@@ -1016,9 +1143,9 @@ def dot(a, b):
 
 def angle3(a, b):
     """Returns the angle in radians of two 3D vectors"""
-    cos_angle = dot(normalize3(a), normalize3(b))
+    cos_angle = (a[0] * b[0] + a[1] * b[1] + a[2] * b[2]) / _sqrt((a[0] * a[0] + a[1] * a[1] + a[2] * a[2]) * (b[0] * b[0] + b[1] * b[1] + b[2] * b[2]))
     cos_angle = min(1.0, max(-1.0, cos_angle))
-    return acos(cos_angle)
+    return _acos(cos_angle)
 
 
 def pose_angle(pose):
@@ -1026,14 +1153,15 @@ def pose_angle(pose):
 
     :param pose: pose
     :type pose: :class:`.Mat`"""
-    cos_ang = (pose[0, 0] + pose[1, 1] + pose[2, 2] - 1) / 2
+    rows = pose.rows
+    cos_ang = (rows[0][0] + rows[1][1] + rows[2][2] - 1) / 2
     cos_ang = min(max(cos_ang, -1), 1)
-    return acos(cos_ang)
+    return _acos(cos_ang)
 
 
 def pose_angle_between(pose1, pose2):
     """Returns the angle in radians between two poses (4x4 matrix pose)"""
-    return pose_angle(invH(pose1) * pose2)
+    return pose_angle(rel_pose(pose1, pose2))
 
 
 def mult3(v, d):
@@ -1058,7 +1186,7 @@ def distance(a, b):
 
 def pose_is_similar(a, b, tolerance=0.1):
     """Check if the pose is similar. Returns True if both poses are less than 0.1 mm or 0.1 deg appart. Optionally provide the tolerance in mm+deg"""
-    if distance(a.Pos(), b.Pos()) + pose_angle_between(a, b) * 180 / pi < tolerance:
+    if distance(a.Pos(), b.Pos()) + pose_angle_between(a, b) * _R2D < tolerance:
         return True
     return False
 
@@ -1086,23 +1214,345 @@ def proj_pt_2_line(point, paxe, vaxe):
 def fitPlane(points):
     """Best fits a plane to a cloud of points"""
     import numpy as np
-    XYZ = np.array(points)
-    [rows, cols] = XYZ.shape
-    # Set up constraint equations of the form  AB = 0,
-    # where B is a column vector of the plane coefficients
-    # in the form b(1)*X + b(2)*Y +b(3)*Z + b(4) = 0.
-    p = (np.ones((rows, 1)))
-    AB = np.hstack([XYZ, p])
-    [u, d, v] = np.linalg.svd(AB, 0)
-    B = v[3, :]  # Solution is last column of v.
-    nn = np.linalg.norm(B[0:3])
-    B = B / nn
-    #pplane = [0, 0, -(B[3] / B[2])]
-    pplane = np.average(XYZ, 0)
-    vplane = B[0:3].tolist()
+    XYZ = np.asarray(points, dtype=np.float64)
+    # The best fit plane goes through the centroid of the points and its normal is the direction of least variance:
+    # the eigenvector of the smallest eigenvalue of the 3x3 scatter matrix of the centered points
+    pplane = XYZ.mean(axis=0)
+    XYZc = XYZ - pplane
+    w, v = np.linalg.eigh(XYZc.T.dot(XYZc))  # eigenvalues in ascending order
+    B = v[:, 0]
+    B = B / np.linalg.norm(B)
+    vplane = B.tolist()
     return pplane, vplane
 
 
+#----------------------------------------------------
+#-------- Batch pose conversions (numpy) ------------
+
+
+def _numpy_or_none():
+    """Returns the numpy module, or None if numpy is not installed. The import is only attempted once."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def _all_floats(rows):
+    """Returns True if all the values of a list of rows are floats"""
+    return all(type(value) is float for row in rows for value in row)
+
+
+def _poses_2_array(poses):
+    """Returns a list of poses (list of :class:`.Mat` or array-like of shape (N,4,4)) as an (N,4,4) numpy array"""
+    import numpy as np
+    if isinstance(poses, Mat):
+        poses = [poses.rows]
+    elif isinstance(poses, PoseArray):
+        return poses.array
+    elif not hasattr(poses, 'shape'):
+        poses = [pose.rows if isinstance(pose, Mat) else pose for pose in poses]
+    return np.asarray(poses, dtype=np.float64).reshape(-1, 4, 4)
+
+
+def Pose_2_KUKA_batch(poses):
+    """Converts a list of poses to XYZABC KUKA targets in one vectorized operation (requires numpy).
+    Each row of the result is the same as calling :func:`~robodk.robomath.Pose_2_KUKA` on the corresponding pose.
+
+    :param poses: list of poses or array of shape (N,4,4)
+    :type poses: list of :class:`.Mat`
+    :return: numpy array of shape (N,6) with [x,y,z,a,b,c] in mm and deg
+
+    .. seealso:: :func:`~robodk.robomath.Pose_2_KUKA`, :func:`~robodk.robomath.KUKA_2_Pose_batch`
+    """
+    import numpy as np
+    H = _poses_2_array(poses)
+    h20 = H[:, 2, 0]
+    near_pos = h20 > (1.0 - 1e-10)
+    near_neg = h20 < (-1.0 + 1e-10)
+    singular = near_pos | near_neg
+    p = np.where(near_pos, -pi / 2, np.where(near_neg, pi / 2, np.arctan2(-h20, np.hypot(H[:, 0, 0], H[:, 1, 0]))))
+    w = np.where(singular, np.arctan2(np.where(near_pos, -H[:, 1, 2], H[:, 1, 2]), H[:, 1, 1]), np.arctan2(H[:, 1, 0], H[:, 0, 0]))
+    r = np.where(singular, 0.0, np.arctan2(H[:, 2, 1], H[:, 2, 2]))
+    return np.column_stack([H[:, 0, 3], H[:, 1, 3], H[:, 2, 3], np.degrees(w), np.degrees(p), np.degrees(r)])
+
+
+def KUKA_2_Pose_batch(xyzabc):
+    """Converts a list of XYZABC KUKA targets to poses in one vectorized operation (requires numpy).
+    Each pose of the result is the same as calling :func:`~robodk.robomath.KUKA_2_Pose` on the corresponding target.
+
+    :param xyzabc: list of [x,y,z,a,b,c] targets in mm and deg, or array of shape (N,6)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.KUKA_2_Pose`, :func:`~robodk.robomath.Pose_2_KUKA_batch`
+    """
+    import numpy as np
+    xyzabc = np.asarray(xyzabc, dtype=np.float64).reshape(-1, 6)
+    abc = np.radians(xyzabc[:, 3:6])
+    ca, cb, cc = np.cos(abc).T
+    sa, sb, sc = np.sin(abc).T
+    H = np.zeros((xyzabc.shape[0], 4, 4))
+    H[:, 0, 0] = cb * ca
+    H[:, 0, 1] = ca * sc * sb - cc * sa
+    H[:, 0, 2] = sc * sa + cc * ca * sb
+    H[:, 1, 0] = cb * sa
+    H[:, 1, 1] = cc * ca + sc * sb * sa
+    H[:, 1, 2] = cc * sb * sa - ca * sc
+    H[:, 2, 0] = -sb
+    H[:, 2, 1] = cb * sc
+    H[:, 2, 2] = cc * cb
+    H[:, 0:3, 3] = xyzabc[:, 0:3]
+    H[:, 3, 3] = 1.0
+    return H
+
+
+def Pose_2_TxyzRxyz_batch(poses):
+    """Converts a list of poses to [x,y,z,rx,ry,rz] targets in one vectorized operation (requires numpy).
+    Each row of the result is the same as calling :func:`~robodk.robomath.Pose_2_TxyzRxyz` on the corresponding pose, except for rotations of 180 deg:
+    the angle is always returned as +pi, while :func:`~robodk.robomath.Pose_2_TxyzRxyz` may return -pi depending on the sign of the zero values of the pose.
+
+    :param poses: list of poses or array of shape (N,4,4)
+    :type poses: list of :class:`.Mat`
+    :return: numpy array of shape (N,6) with [x,y,z,rx,ry,rz] in mm and radians
+
+    .. seealso:: :func:`~robodk.robomath.Pose_2_TxyzRxyz`, :func:`~robodk.robomath.Pose_2_KUKA_batch`
+    """
+    import numpy as np
+    H = _poses_2_array(poses)
+    c = H[:, 0, 2]
+    near_pos = c > (1.0 - 1e-10)
+    near_neg = c < (-1.0 + 1e-10)
+    singular = near_pos | near_neg
+    cy = np.sqrt(np.maximum(1.0 - c * c, 0.0))
+    # Adding 0.0 turns -0.0 into 0.0 so that rotations of 180 deg return +pi instead of -pi
+    rx = np.where(singular, 0.0, np.arctan2(0.0 - H[:, 1, 2], H[:, 2, 2]))
+    ry = np.where(near_pos, pi / 2, np.where(near_neg, -pi / 2, np.arctan2(c, cy)))
+    rz = np.where(singular, np.arctan2(H[:, 1, 0] + 0.0, H[:, 1, 1]), np.arctan2(0.0 - H[:, 0, 1], H[:, 0, 0]))
+    return np.column_stack([H[:, 0, 3], H[:, 1, 3], H[:, 2, 3], rx, ry, rz])
+
+
+def Pose_2_UR_batch(poses):
+    """Converts a list of poses to p[x,y,z,u,v,w] Universal Robots targets (rotation vector) in one vectorized operation (requires numpy).
+    Each row of the result is the same as calling :func:`~robodk.robomath.Pose_2_UR` on the corresponding pose.
+
+    :param poses: list of poses or array of shape (N,4,4)
+    :type poses: list of :class:`.Mat`
+    :return: numpy array of shape (N,6) with [x,y,z,u,v,w] in mm and radians
+
+    .. seealso:: :func:`~robodk.robomath.Pose_2_UR`, :func:`~robodk.robomath.UR_2_Pose_batch`
+    """
+    import numpy as np
+    NUMERIC_TOLERANCE = 1e-8
+    H = _poses_2_array(poses)
+    R = H[:, 0:3, 0:3]
+    angle = np.arccos(np.clip((R[:, 0, 0] + R[:, 1, 1] + R[:, 2, 2] - 1) * 0.5, -1.0, 1.0))
+    rxyz = np.stack([R[:, 2, 1] - R[:, 1, 2], R[:, 0, 2] - R[:, 2, 0], R[:, 1, 0] - R[:, 0, 1]], axis=1)
+    rnorm = np.linalg.norm(rxyz, axis=1)
+    zero = angle < NUMERIC_TOLERANCE
+    singular = ~zero & ((np.abs(np.sin(angle)) < NUMERIC_TOLERANCE) | (rnorm < NUMERIC_TOLERANCE))
+
+    # General case: normalized antisymmetric part scaled by the angle
+    scale = np.divide(angle, rnorm, out=np.zeros_like(angle), where=~(zero | singular))
+    uvw = rxyz * scale[:, None]
+
+    # Rotations close to 180 deg: the axis is taken from the column of the largest diagonal element
+    if np.any(singular):
+        idx = np.nonzero(singular)[0]
+        diag = np.stack([R[idx, 0, 0], R[idx, 1, 1], R[idx, 2, 2]], axis=1)
+        k = np.argmax(diag, axis=1)
+        mx = diag[np.arange(len(idx)), k]
+        col = R[idx, :, k].copy()
+        col[np.arange(len(idx)), k] += 1.0
+        uvw[idx] = col * (angle[idx] / np.sqrt(np.maximum(0.0, 2.0 * (1.0 + mx))))[:, None]
+
+    return np.column_stack([H[:, 0:3, 3], uvw])
+
+
+def UR_2_Pose_batch(xyzuvw):
+    """Converts a list of p[x,y,z,u,v,w] Universal Robots targets (rotation vector) to poses in one vectorized operation (requires numpy).
+    Each pose of the result is the same as calling :func:`~robodk.robomath.UR_2_Pose` on the corresponding target.
+
+    :param xyzuvw: list of [x,y,z,u,v,w] targets in mm and radians, or array of shape (N,6)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.UR_2_Pose`, :func:`~robodk.robomath.Pose_2_UR_batch`
+    """
+    import numpy as np
+    xyzuvw = np.asarray(xyzuvw, dtype=np.float64).reshape(-1, 6)
+    uvw = xyzuvw[:, 3:6]
+    angle = np.linalg.norm(uvw, axis=1)
+    ratio = np.divide(np.sin(0.5 * angle), angle, out=np.zeros_like(angle), where=angle != 0.0)
+    q1 = np.cos(0.5 * angle)
+    q2, q3, q4 = (uvw * ratio[:, None]).T
+    H = np.zeros((xyzuvw.shape[0], 4, 4))
+    H[:, 0, 0] = 1 - 2 * q3 * q3 - 2 * q4 * q4
+    H[:, 0, 1] = 2 * q2 * q3 - 2 * q4 * q1
+    H[:, 0, 2] = 2 * q2 * q4 + 2 * q3 * q1
+    H[:, 1, 0] = 2 * q2 * q3 + 2 * q4 * q1
+    H[:, 1, 1] = 1 - 2 * q2 * q2 - 2 * q4 * q4
+    H[:, 1, 2] = 2 * q3 * q4 - 2 * q2 * q1
+    H[:, 2, 0] = 2 * q2 * q4 - 2 * q3 * q1
+    H[:, 2, 1] = 2 * q3 * q4 + 2 * q2 * q1
+    H[:, 2, 2] = 1 - 2 * q2 * q2 - 2 * q3 * q3
+    H[:, 0:3, 3] = xyzuvw[:, 0:3]
+    H[:, 3, 3] = 1.0
+    return H
+
+
+def _rot_many(angles, i, j, sign):
+    """Returns an array of rotation poses of shape angles.shape+(4,4) that rotate in the plane of the axes i and j. sign is the sign of the sine in the element [i,j]."""
+    import numpy as np
+    angles = np.asarray(angles, dtype=np.float64)
+    c = np.cos(angles)
+    s = np.sin(angles)
+    R = np.zeros(angles.shape + (4, 4))
+    R[..., 0, 0] = R[..., 1, 1] = R[..., 2, 2] = R[..., 3, 3] = 1.0
+    R[..., i, i] = c
+    R[..., j, j] = c
+    R[..., i, j] = sign * s
+    R[..., j, i] = -sign * s
+    return R
+
+
+def rotx_many(rx):
+    """Returns the rotation matrices around the X axis for an array of angles in radians, in one vectorized operation (requires numpy).
+    Each matrix of the result is the same as calling :func:`~robodk.robomath.rotx` on the corresponding angle.
+
+    :param rx: rotations around X axis in radians, array of shape (N,)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.rotx`, :func:`~robodk.robomath.apply_many`
+    """
+    return _rot_many(rx, 1, 2, -1.0)
+
+
+def roty_many(ry):
+    """Returns the rotation matrices around the Y axis for an array of angles in radians, in one vectorized operation (requires numpy).
+    Each matrix of the result is the same as calling :func:`~robodk.robomath.roty` on the corresponding angle.
+
+    :param ry: rotations around Y axis in radians, array of shape (N,)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.roty`, :func:`~robodk.robomath.apply_many`
+    """
+    return _rot_many(ry, 0, 2, 1.0)
+
+
+def rotz_many(rz):
+    """Returns the rotation matrices around the Z axis for an array of angles in radians, in one vectorized operation (requires numpy).
+    Each matrix of the result is the same as calling :func:`~robodk.robomath.rotz` on the corresponding angle.
+
+    :param rz: rotations around Z axis in radians, array of shape (N,)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.rotz`, :func:`~robodk.robomath.apply_many`
+    """
+    return _rot_many(rz, 0, 1, -1.0)
+
+
+def apply_many(pose, poses):
+    """Multiplies a pose by an array of poses in one vectorized operation (requires numpy). This is the recommended way to evaluate a trajectory given as a sweep of angles, for example: apply_many(pose, rotz_many(angles)).
+    Each matrix of the result is the same as pose*poses[i].
+
+    :param pose: reference pose
+    :type pose: :class:`.Mat`
+    :param poses: array of shape (N,4,4) (or list of :class:`.Mat`)
+    :return: numpy array of shape (N,4,4)
+
+    .. seealso:: :func:`~robodk.robomath.rotx_many`, :func:`~robodk.robomath.roty_many`, :func:`~robodk.robomath.rotz_many`
+    """
+    import numpy as np
+    H = np.asarray(pose.rows if isinstance(pose, Mat) else pose, dtype=np.float64)
+    return np.matmul(H, _poses_2_array(poses))
+
+
+def _dh_links(params, modified):
+    """Returns the link matrices of shape (N,4,4) for a list of N D-H (or D-H Modified) parameters"""
+    import numpy as np
+    params = np.asarray(params, dtype=np.float64).reshape(-1, 4)
+    if modified:
+        rx, tx, tz, rz = params[:, 0], params[:, 1], params[:, 2], params[:, 3]
+    else:
+        rz, tx, tz, rx = params[:, 0], params[:, 1], params[:, 2], params[:, 3]
+    crx = np.cos(rx)
+    srx = np.sin(rx)
+    crz = np.cos(rz)
+    srz = np.sin(rz)
+    L = np.zeros((params.shape[0], 4, 4))
+    L[:, 3, 3] = 1.0
+    if modified:
+        L[:, 0, 0] = crz
+        L[:, 0, 1] = -srz
+        L[:, 0, 3] = tx
+        L[:, 1, 0] = crx * srz
+        L[:, 1, 1] = crx * crz
+        L[:, 1, 2] = -srx
+        L[:, 1, 3] = -tz * srx
+        L[:, 2, 0] = srx * srz
+        L[:, 2, 1] = crz * srx
+        L[:, 2, 2] = crx
+        L[:, 2, 3] = tz * crx
+    else:
+        L[:, 0, 0] = crz
+        L[:, 0, 1] = -srz * crx
+        L[:, 0, 2] = srz * srx
+        L[:, 0, 3] = tx * crz
+        L[:, 1, 0] = srz
+        L[:, 1, 1] = crz * crx
+        L[:, 1, 2] = -crz * srx
+        L[:, 1, 3] = tx * srz
+        L[:, 2, 1] = srx
+        L[:, 2, 2] = crx
+        L[:, 2, 3] = tz
+    return L
+
+
+def _chain(links):
+    """Returns the product of a sequence of 4x4 matrices (identity if empty)"""
+    import numpy as np
+    from functools import reduce
+    return reduce(np.matmul, links, np.eye(4))
+
+
+def dh_chain(params):
+    """Returns the pose of a kinematic chain given the Denavit-Hartenberg parameters of each link, in one vectorized operation (requires numpy).
+    The result is the same as multiplying dh(params[0])*dh(params[1])*...
+
+    :param params: list of [rz,tx,tz,rx] parameters, or array of shape (N,4)
+    :return: numpy array of shape (4,4)
+
+    .. seealso:: :func:`~robodk.robomath.dh`, :func:`~robodk.robomath.dh_chain_to_pose`, :func:`~robodk.robomath.dhm_chain`
+    """
+    return _chain(_dh_links(params, False))
+
+
+def dh_chain_to_pose(params):
+    """Returns the pose of a kinematic chain given the Denavit-Hartenberg parameters of each link (requires numpy).
+    Same as :func:`~robodk.robomath.dh_chain` but returns a :class:`.Mat`.
+
+    :param params: list of [rz,tx,tz,rx] parameters, or array of shape (N,4)
+
+    .. seealso:: :func:`~robodk.robomath.dh`, :func:`~robodk.robomath.dh_chain`
+    """
+    return Mat._from_rows_unsafe(dh_chain(params).tolist())
+
+
+def dhm_chain(params):
+    """Returns the pose of a kinematic chain given the Denavit-Hartenberg Modified parameters of each link, in one vectorized operation (requires numpy).
+    The result is the same as multiplying dhm(params[0])*dhm(params[1])*...
+
+    :param params: list of [rx,tx,tz,rz] parameters, or array of shape (N,4)
+    :return: numpy array of shape (4,4)
+
+    .. seealso:: :func:`~robodk.robomath.dhm`, :func:`~robodk.robomath.dh_chain`
+    """
+    return _chain(_dh_links(params, True))
+
+
 #----------------------------------------------------
 #--------       Mat matrix class      ---------------
 
@@ -1165,6 +1615,9 @@ class Mat(object):
             else:
                 if isinstance(rows, Mat):
                     rows = rows.copy().rows
+                elif getattr(rows, 'ndim', 0) >= 1 and hasattr(rows, 'tolist') and not isinstance(rows, list):
+                    # numpy array (copied as a list of lists of floats). numpy scalars (ndim 0) are handled as other scalars
+                    rows = rows.tolist()
                 m = len(rows)
                 transpose = 0
                 if isinstance(rows, list) and len(rows) == 0:
@@ -1197,18 +1650,33 @@ class Mat(object):
 
             self.rows = [[0] * n for x in range(m)]
 
+    def __array__(self, dtype=None, copy=None):
+        """Returns the matrix as a numpy array. This allows passing a Mat directly to numpy functions, for example: numpy.asarray(pose)"""
+        import numpy as np
+        return np.array(self.rows, dtype=dtype)
+
+    @staticmethod
+    def _from_rows_unsafe(rows):
+        """Creates a matrix that takes ownership of rows (list of lists) without validating or copying it. Internal use only: rows must be a list of rows of equal length."""
+        mat = Mat.__new__(Mat)
+        mat.rows = rows
+        return mat
+
+    @staticmethod
+    def _from_flat16(values, column_major=False):
+        """Creates a 4x4 matrix from a flat sequence of 16 values in row-major order (or column-major order if column_major is True), without validation. Internal use only."""
+        if column_major:
+            return Mat._from_rows_unsafe([list(values[0::4]), list(values[1::4]), list(values[2::4]), list(values[3::4])])
+        return Mat._from_rows_unsafe([list(values[0:4]), list(values[4:8]), list(values[8:12]), list(values[12:16])])
+
     def __iter__(self):
-        if self.size(0) == 0 or self.size(1) == 0:
+        rows = self.rows
+        if len(rows) == 0 or len(rows[0]) == 0:
             return iter([])
-        return iter(self.tr().rows)
+        return iter([list(col) for col in zip(*rows)])
 
     def copy(self):
-        sz = self.size()
-        newmat = Mat(sz[0], sz[1])
-        for i in range(sz[0]):
-            for j in range(sz[1]):
-                newmat[i, j] = self[i, j]
-        return newmat
+        return Mat._from_rows_unsafe([row[:] for row in self.rows])
 
     def __len__(self):
         """Return the number of columns"""
@@ -1255,9 +1723,12 @@ class Mat(object):
 
     def __getitem__(self, idx):
         if isinstance(idx, int):  #integer A[1]
-            return tr(Mat(self.rows[idx]))
+            return Mat._from_rows_unsafe([list(self.rows[idx])])
         elif isinstance(idx, slice):  #one slice: A[1:3]
-            return Mat(self.rows[idx])
+            rows = self.rows[idx]
+            if len(rows) == 0:
+                return Mat(rows)
+            return Mat._from_rows_unsafe(rows)
         else:  #two slices: A[1:3,1:3]
             idx1 = idx[0]
             idx2 = idx[1]
@@ -1274,22 +1745,17 @@ class Mat(object):
                 rg2 = range(*indices2)
             else:  #is int
                 rg2 = range(idx2, idx2 + 1)
-            #newm = int(abs((rg1.stop-rg1.start)/rg1.step))
-            #newn = int(abs((rg2.stop-rg2.start)/rg2.step))
-            newm = rg1
-            newn = rg2
-            newmat = Mat(len(newm), len(newn))
-            cm = 0
-            for i in rg1:
-                cn = 0
-                for j in rg2:
-                    newmat.rows[cm][cn] = self.rows[i][j]
-                    cn = cn + 1
-                cm = cm + 1
-            return newmat
+            if len(rg1) == 0:
+                return Mat(0, len(rg2))
+            rows = self.rows
+            return Mat._from_rows_unsafe([[rows[i][j] for j in rg2] for i in rg1])
 
     def __setitem__(self, idx, item):
         if isinstance(item, float) or isinstance(item, int):
+            if isinstance(idx, tuple) and isinstance(idx[0], int) and isinstance(idx[1], int):
+                # single element: A[i,j] = value
+                self.rows[idx[0]][idx[1]] = item
+                return
             item = Mat([[item]])
         elif isinstance(item, list):
             item = Mat(item)
@@ -1340,7 +1806,7 @@ class Mat(object):
         str_add = ''
         if self.isHomogeneous():
             x, y, z, rx, ry, rz = Pose_2_TxyzRxyz(self)
-            str_add = 'Pose(%.3f, %.3f, %.3f,  %.3f, %.3f, %.3f):\n' % (x, y, z, rx * 180 / pi, ry * 180 / pi, rz * 180 / pi)
+            str_add = 'Pose(%.3f, %.3f, %.3f,  %.3f, %.3f, %.3f):\n' % (x, y, z, rx * _R2D, ry * _R2D, rz * _R2D)
 
         s = '\n [ '.join([(', '.join([('%.3f' % item if type(item) == float else str(item)) for item in row]) + ' ],') for row in self.rows])
         return str_add + '[[ ' + s[:-1] + ']\n'
@@ -1353,20 +1819,21 @@ class Mat(object):
 
     def tr(self):
         """Returns the transpose of the matrix"""
-        if self.size(0) == 0 or self.size(1) == 0:
+        rows = self.rows
+        if len(rows) == 4 and len(rows[0]) == 4:
+            # 4x4 matrix (pose): explicit transpose
+            r0, r1, r2, r3 = rows
+            return Mat._from_rows_unsafe([[r0[0], r1[0], r2[0], r3[0]], [r0[1], r1[1], r2[1], r3[1]], [r0[2], r1[2], r2[2], r3[2]], [r0[3], r1[3], r2[3], r3[3]]])
+        if len(rows) == 0 or len(rows[0]) == 0:
             return Mat(0, 0)
-        mat = Mat([list(item) for item in zip(*self.rows)])
-        return mat
+        return Mat._from_rows_unsafe([list(item) for item in zip(*rows)])
 
     def size(self, dim=None):
         """Returns the size of a matrix (m,n).
         Dim can be set to 0 to return m (rows) or 1 to return n (columns)"""
-        m = len(self.rows)
-        if m > 0:
-            n = len(self.rows[0])
-        else:
-            n = 0
-
+        rows = self.rows
+        m = len(rows)
+        n = len(rows[0]) if m > 0 else 0
         if dim is None:
             return (m, n)
         elif dim == 0:
@@ -1387,10 +1854,7 @@ class Mat(object):
         if sz1[1] != sz2[1]:
             raise Exception(MatrixError, "Horizontal size of matrices does not match")
 
-        newmat = Mat(sz1[0] + sz2[0], sz1[1])
-        newmat[0:sz1[0], :] = self
-        newmat[sz1[0]:, :] = mat2
-        return newmat
+        return Mat._from_rows_unsafe([row[:] for row in self.rows] + [row[:] for row in mat2.rows])
 
     def catH(self, mat2):
         """Concatenate with another matrix (horizontal concatenation)"""
@@ -1403,76 +1867,52 @@ class Mat(object):
         if sz1[0] != sz2[0]:
             raise Exception(MatrixError, "Horizontal size of matrices does not match")
 
-        newmat = Mat(sz1[0], sz1[1] + sz2[1])
-        newmat[:, :sz1[1]] = self
-        newmat[:, sz1[1]:] = mat2
-        return newmat
+        return Mat._from_rows_unsafe([row1 + row2 for row1, row2 in zip(self.rows, mat2.rows)])
 
     def __eq__(self, other):
-        """Test equality"""
-        if other is None:
+        """Test equality (element-wise). Use :func:`~robodk.robomath.Mat.is_close` to check if two poses are similar"""
+        if not isinstance(other, Mat):
             return False
-        #return (other.rows == self.rows)
-        return pose_is_similar(other, self)
+        return self.rows == other.rows
 
     def __ne__(self, other):
         return not (self == other)
 
+    def is_close(self, other, tolerance=0.1):
+        """Check if the pose is similar to another pose. Returns True if both poses are less than 0.1 mm or 0.1 deg appart. Optionally provide the tolerance in mm+deg
+
+        .. seealso:: :func:`~robodk.robomath.pose_is_similar`
+        """
+        if other is None:
+            return False
+        return pose_is_similar(other, self, tolerance)
+
     def __add__(self, mat):
         """Add a matrix to this matrix and
         return the new matrix. It doesn't modify
         the current matrix"""
         if isinstance(mat, int) or isinstance(mat, float):
-            m, n = self.size()
-            result = Mat(m, n)
-            for x in range(m):
-                for y in range(n):
-                    result.rows[x][y] = self.rows[x][y] + mat
-            return result
-        sz = self.size()
-        m = sz[0]
-        n = sz[1]
-        ret = Mat(m, n)
-        if sz != mat.size():
+            return Mat._from_rows_unsafe([[value + mat for value in row] for row in self.rows])
+        if self.size() != mat.size():
             raise Exception(MatrixError, "Can not add matrices of sifferent sizes!")
-        for x in range(m):
-            row = [sum(item) for item in zip(self.rows[x], mat.rows[x])]
-            ret.rows[x] = row
-        return ret
+        return Mat._from_rows_unsafe([[value_a + value_b for value_a, value_b in zip(row_a, row_b)] for row_a, row_b in zip(self.rows, mat.rows)])
 
     def __sub__(self, mat):
         """Subtract a matrix from this matrix and
         return the new matrix. It doesn't modify
         the current matrix"""
         if isinstance(mat, int) or isinstance(mat, float):
-            m, n = self.size()
-            result = Mat(m, n)
-            for x in range(m):
-                for y in range(n):
-                    result.rows[x][y] = self.rows[x][y] - mat
-            return result
-        sz = self.size()
-        m = sz[0]
-        n = sz[1]
-        ret = Mat(m, n)
-        if sz != mat.size():
+            return Mat._from_rows_unsafe([[value - mat for value in row] for row in self.rows])
+        if self.size() != mat.size():
             raise Exception(MatrixError, "Can not subtract matrices of sifferent sizes!")
-        for x in range(m):
-            row = [item[0] - item[1] for item in zip(self.rows[x], mat.rows[x])]
-            ret.rows[x] = row
-        return ret
+        return Mat._from_rows_unsafe([[value_a - value_b for value_a, value_b in zip(row_a, row_b)] for row_a, row_b in zip(self.rows, mat.rows)])
 
     def __mul__(self, mat):
         """Multiply a matrix with this matrix and
         return the new matrix. It doesn't modify
         the current matrix"""
         if isinstance(mat, int) or isinstance(mat, float):
-            m, n = self.size()
-            mulmat = Mat(m, n)
-            for x in range(m):
-                for y in range(n):
-                    mulmat.rows[x][y] = self.rows[x][y] * mat
-            return mulmat
+            return Mat._from_rows_unsafe([[value * mat for value in row] for row in self.rows])
         if isinstance(mat, list):  #case of a matrix times a vector
             szvect = len(mat)
             m = self.size(0)
@@ -1487,43 +1927,77 @@ class Mat(object):
             else:
                 raise Exception(MatrixError, "Invalid product")
         else:
-            matm, matn = mat.size()
-            m, n = self.size()
+            rows_a = self.rows
+            rows_b = mat.rows
+            if len(rows_a) == 4 and len(rows_b) == 4 and len(rows_a[0]) == 4 and len(rows_b[0]) == 4:
+                # 4x4 product (poses): fully unrolled, without size checks, transpose or generic loops
+                return Mat._from_rows_unsafe(_mult4x4(rows_a, rows_b))
+            m = len(rows_a)
+            n = len(rows_a[0]) if m > 0 else 0
+            matm = len(rows_b)
+            matn = len(rows_b[0]) if matm > 0 else 0
             if (n != matm):
                 raise Exception(MatrixError, "Matrices cannot be multipled (unexpected size)!")
-            mat_t = mat.tr()
-            mulmat = Mat(m, matn)
-            for x in range(m):
-                for y in range(mat_t.size(0)):
-                    mulmat.rows[x][y] = sum([item[0] * item[1] for item in zip(self.rows[x], mat_t.rows[y])])
-            return mulmat
+            if m > 1 and matn > 1 and m * matn >= _NUMPY_MATMUL_MIN_OUT and m * n * matn >= _NUMPY_MATMUL_MIN and _all_floats(rows_a) and _all_floats(rows_b):
+                # Large product of floats: let numpy do the loops (if available). Other values (int, Decimal, ...) keep their type with the Python loops
+                np = _numpy_or_none()
+                if np is not None:
+                    return Mat._from_rows_unsafe(np.dot(np.asarray(rows_a, dtype=np.float64), np.asarray(rows_b, dtype=np.float64)).tolist())
+            cols_b = list(zip(*rows_b))
+            rows = []
+            for row_a in rows_a:
+                row = []
+                for col_b in cols_b:
+                    # Dot product without building the list of products
+                    value = 0
+                    for value_a, value_b in zip(row_a, col_b):
+                        value += value_a * value_b
+                    row.append(value)
+                rows.append(row)
+            return Mat._from_rows_unsafe(rows)
+
+    @staticmethod
+    def mul_many(mats):
+        """Returns the product of a sequence of matrices: mats[0]*mats[1]*...*mats[-1] (identity matrix if the sequence is empty).
+        Faster than chaining the * operator with poses (4x4 matrices) because no intermediate :class:`.Mat` is created.
+
+        :param mats: list of :class:`.Mat`, or numpy array of shape (N,4,4) (multiplied with numpy)
+        :return: :class:`.Mat`
+        """
+        if hasattr(mats, 'ndim'):
+            return Mat._from_rows_unsafe(_chain(mats).tolist())
+        mats = list(mats)
+        if len(mats) == 0:
+            return eye(4)
+        if len(mats) == 1:
+            return mats[0].copy()
+        rows = mats[0].rows
+        for mat in mats[1:]:
+            rows_b = mat.rows
+            if len(rows) == 4 and len(rows_b) == 4 and len(rows[0]) == 4 and len(rows_b[0]) == 4:
+                rows = _mult4x4(rows, rows_b)
+            else:
+                rows = (Mat._from_rows_unsafe(rows) * mat).rows
+        return Mat._from_rows_unsafe(rows)
 
     def eye(self, m=4):
         """Make identity matrix of size (mxm)"""
-        rows = [[0] * m for x in range(m)]
-        idx = 0
-        for row in rows:
-            row[idx] = 1
-            idx += 1
-        return Mat(rows)
+        return eye(m)
 
     def isHomogeneous(self):
         """returns 1 if it is a Homogeneous matrix"""
-        m, n = self.size()
-        if m != 4 or n != 4:
+        rows = self.rows
+        if len(rows) != 4 or len(rows[0]) != 4:
             return False
         #if self[3,:] != Mat([[0.0,0.0,0.0,1.0]]):
         #    return False
-        test = self[0:3, 0:3]
-        test = test * test.tr()
-        test[0, 0] = test[0, 0] - 1.0
-        test[1, 1] = test[1, 1] - 1.0
-        test[2, 2] = test[2, 2] - 1.0
-        zero = 0.0
-        for x in range(3):
-            for y in range(3):
-                zero = zero + abs(test[x, y])
-        if zero > 1e-4:
+        # Deviation of R*R' from the identity (R*R' is symmetric: each off-diagonal term counts twice)
+        (a0, a1, a2), (b0, b1, b2), (c0, c1, c2) = rows[0][:3], rows[1][:3], rows[2][:3]
+        ab = abs(a0 * b0 + a1 * b1 + a2 * b2)
+        ac = abs(a0 * c0 + a1 * c1 + a2 * c2)
+        bc = abs(b0 * c0 + b1 * c1 + b2 * c2)
+        zero = abs(a0 * a0 + a1 * a1 + a2 * a2 - 1.0) + ab + ac + ab + abs(b0 * b0 + b1 * b1 + b2 * b2 - 1.0) + bc + ac + bc + abs(c0 * c0 + c1 * c1 + c2 * c2 - 1.0)
+        if zero > _HOMOGENEOUS_TOL:
             return False
         return True
 
@@ -1558,113 +2032,229 @@ class Mat(object):
         return Offset(self, x, y, z, rx, ry, rz)
 
     def invH(self):
-        """Returns the inverse of this pose (homogeneous matrix assumed)"""
-        if not self.isHomogeneous():
+        """Returns the inverse of this pose (homogeneous matrix assumed). The matrix must be homogeneous: this is checked unless SKIP_HOMOGENEOUS_CHECK is set to True."""
+        if not SKIP_HOMOGENEOUS_CHECK and not self.isHomogeneous():
             raise Exception(MatrixError, "Pose matrix is not homogeneous. invH() can only compute the inverse of a homogeneous matrix")
-        Hout = self.tr()
-        Hout[3, 0:3] = Mat([[0, 0, 0]])
-        Hout[0:3, 3] = (Hout[0:3, 0:3] * self[0:3, 3]) * (-1)
-        return Hout
+        return Mat._from_rows_unsafe(_invH_rows(self.rows))
 
     def inv(self):
         """Returns the inverse of this pose (homogeneous matrix assumed)"""
         return self.invH()
 
+    def relative_to(self, pose_ref):
+        """Returns this pose relative to the reference pose pose_ref. Same as pose_ref.inv()*self.
+
+        .. seealso:: :func:`~robodk.robomath.rel_pose`
+        """
+        return rel_pose(pose_ref, self)
+
     def tolist(self):
         """Returns the first column of the matrix as a list"""
-        return tr(self).rows[0]
+        rows = self.rows
+        if len(rows[0]) == 0:
+            return []
+        return [row[0] for row in rows]
 
     def list(self):
         """Returns the first column of the matrix as a list"""
-        return tr(self).rows[0]
+        return self.tolist()
 
     def list2(self):
         """Returns the matrix as list of lists (one list per column)"""
-        return tr(self).rows
+        return self.tr().rows
 
     def Pos(self):
         """Returns the position of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
-        return self[0:3, 3].tolist()
+        rows = self.rows
+        return [rows[0][3], rows[1][3], rows[2][3]]
 
     def VX(self):
         """Returns the X vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
-        return self[0:3, 0].tolist()
+        rows = self.rows
+        return [rows[0][0], rows[1][0], rows[2][0]]
 
     def VY(self):
         """Returns the Y vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
-        return self[0:3, 1].tolist()
+        rows = self.rows
+        return [rows[0][1], rows[1][1], rows[2][1]]
 
     def VZ(self):
         """Returns the Z vector of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
-        return self[0:3, 2].tolist()
+        rows = self.rows
+        return [rows[0][2], rows[1][2], rows[2][2]]
 
     def Rot33(self):
         """Returns the sub 3x3 rotation matrix"""
-        return self[0:3, 0:3]
+        return Mat._from_rows_unsafe([row[:3] for row in self.rows[:3]])
 
     def setPos(self, newpos):
         """Sets the XYZ position of a pose (assumes that a 4x4 homogeneous matrix is being used)"""
-        self[0, 3] = newpos[0]
-        self[1, 3] = newpos[1]
-        self[2, 3] = newpos[2]
+        rows = self.rows
+        rows[0][3] = newpos[0]
+        rows[1][3] = newpos[1]
+        rows[2][3] = newpos[2]
+        return self
+
+    def _set_col(self, k, v_xyz):
+        """Sets the first 3 elements of the column k to the normalized vector v_xyz"""
+        x, y, z = v_xyz[0], v_xyz[1], v_xyz[2]
+        norm2 = x * x + y * y + z * z
+        if abs(norm2 - 1.0) > 1e-12:
+            # Not unitary yet (vectors taken from another pose are usually unitary already)
+            norminv = 1.0 / _sqrt(norm2)
+            x, y, z = x * norminv, y * norminv, z * norminv
+        rows = self.rows
+        rows[0][k] = x
+        rows[1][k] = y
+        rows[2][k] = z
         return self
 
     def setVX(self, v_xyz):
         """Sets the VX vector of a pose, which is the first column of a homogeneous matrix (assumes that a 4x4 homogeneous matrix is being used)"""
-        v_xyz = normalize3(v_xyz)
-        self[0, 0] = v_xyz[0]
-        self[1, 0] = v_xyz[1]
-        self[2, 0] = v_xyz[2]
-        return self
+        return self._set_col(0, v_xyz)
 
     def setVY(self, v_xyz):
         """Sets the VY vector of a pose, which is the first column of a homogeneous matrix (assumes that a 4x4 homogeneous matrix is being used)"""
-        v_xyz = normalize3(v_xyz)
-        self[0, 1] = v_xyz[0]
-        self[1, 1] = v_xyz[1]
-        self[2, 1] = v_xyz[2]
-        return self
+        return self._set_col(1, v_xyz)
 
     def setVZ(self, v_xyz):
         """Sets the VZ vector of a pose, which is the first column of a homogeneous matrix (assumes that a 4x4 homogeneous matrix is being used)"""
-        v_xyz = normalize3(v_xyz)
-        self[0, 2] = v_xyz[0]
-        self[1, 2] = v_xyz[1]
-        self[2, 2] = v_xyz[2]
+        return self._set_col(2, v_xyz)
+
+    def setRot33(self, rot33):
+        """Sets the sub 3x3 rotation matrix of a pose (assumes that a 4x4 homogeneous matrix is being used). The position is not modified.
+
+        :param rot33: 3x3 rotation matrix
+        :type rot33: :class:`.Mat` or list of lists
+        """
+        if isinstance(rot33, Mat):
+            rot33 = rot33.rows
+        for row, row_rot in zip(self.rows, rot33[:3]):
+            row[0] = row_rot[0]
+            row[1] = row_rot[1]
+            row[2] = row_rot[2]
         return self
 
     def translationPose(self):
         """Return the translation pose of this matrix. The rotation returned is set to identity (assumes that a 4x4 homogeneous matrix is being used)"""
-        return transl(self.Pos())
+        rows = self.rows
+        return transl(rows[0][3], rows[1][3], rows[2][3])
 
     def rotationPose(self):
         """Return the rotation pose of this matrix. The position returned is set to [0,0,0] (assumes that a 4x4 homogeneous matrix is being used)"""
-        mat_rotation = Mat(self)
-        mat_rotation.setPos([0, 0, 0])
-        return mat_rotation
+        r0, r1, r2, r3 = self.rows
+        return Mat._from_rows_unsafe([[r0[0], r0[1], r0[2], 0], [r1[0], r1[1], r1[2], 0], [r2[0], r2[1], r2[2], 0], [r3[0], r3[1], r3[2], r3[3]]])
 
     def SaveCSV(self, strfile):
         """Save the :class:`.Mat` Matrix to a CSV (Comma Separated Values) file. The file can be easily opened as a spreadsheet such as Excel.
 
         .. seealso:: :func:`~Mat.SaveMat`, :func:`~robodk.robomath.SaveList`, :func:`~robodk.robomath.LoadList`, :func:`~robodk.robomath.LoadMat`
         """
-        self.tr().SaveMat(strfile)
+        # One line per row
+        Mat._save_lines(strfile, self.rows, len(self.rows[0]), ',')
 
     def SaveMat(self, strfile, separator=','):
         """Save the :class:`.Mat` Matrix to a CSV or TXT file
 
         .. seealso:: :func:`~Mat.SaveCSV`, :func:`~robodk.robomath.SaveList`, :func:`~robodk.robomath.LoadList`, :func:`~robodk.robomath.LoadMat`
         """
-        sz = self.size()
-        m = sz[0]
-        n = sz[1]
+        # One line per column
+        Mat._save_lines(strfile, zip(*self.rows), len(self.rows), separator)
+
+    @staticmethod
+    def _save_lines(strfile, lines, count, separator):
+        """Writes each line of count values to a file, each value formatted as %.6f followed by the separator"""
         file = open(strfile, 'w')
-        for j in range(n):
-            for i in range(m):
-                file.write(('%.6f' + separator) % self.rows[i][j])
-            file.write('\n')
+        if count > 0:
+            # Format each line with a single format string and write the text in chunks of lines
+            line_fmt = ('%.6f' + separator.replace('%', '%%')) * count + '\n'
+            buf = []
+            for line in lines:
+                buf.append(line_fmt % tuple(line))
+                if len(buf) >= 1024:
+                    file.write(''.join(buf))
+                    buf = []
+            file.write(''.join(buf))
         file.close()
 
 
+#----------------------------------------------------
+#--------       PoseArray class       ---------------
+
+
+class PoseArray(object):
+    """An array of N poses stored as a single numpy array of shape (N,4,4) (requires numpy).
+    Operations on all poses are calculated at once with numpy. A PoseArray can be passed to the batch functions, such as :func:`~robodk.robomath.Pose_2_KUKA_batch`.
+
+    Example:
+
+        .. code-block:: python
+
+            poses = PoseArray([target.Pose() for target in targets])
+            positions = poses.positions()  # numpy array of shape (N,3)
+            poses_wrt_ref = poses.apply(invH(ref))  # new PoseArray
+            for pose in poses_wrt_ref:
+                print(Pose_2_TxyzRxyz(pose))
+
+    :param poses: list of :class:`.Mat` or array-like of shape (N,4,4)
+
+    .. seealso:: :class:`.Mat`, :func:`~robodk.robomath.apply_many`
+    """
+
+    def __init__(self, poses=None):
+        import numpy as np
+        if poses is None:
+            poses = []
+        self.array = np.array(_poses_2_array(poses))
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __getitem__(self, i):
+        """Returns the pose i as a :class:`.Mat` (copy). Slices and index arrays return a new :class:`.PoseArray`"""
+        poses = self.array[i]
+        if poses.ndim == 3:
+            return PoseArray(poses)
+        if poses.ndim != 2:
+            raise TypeError("Invalid PoseArray index: %s" % str(i))
+        return Mat._from_rows_unsafe(poses.tolist())
+
+    def __iter__(self):
+        for pose in self.array.tolist():
+            yield Mat._from_rows_unsafe(pose)
+
+    def __array__(self, dtype=None, copy=None):
+        """Returns the poses as a numpy array of shape (N,4,4)"""
+        import numpy as np
+        return np.array(self.array, dtype=dtype)
+
+    def tolist(self):
+        """Returns the poses as a list of :class:`.Mat`"""
+        return list(self)
+
+    def positions(self):
+        """Returns the positions of all poses as an array of shape (N,3) (view of the poses data)"""
+        return self.array[:, :3, 3]
+
+    def apply(self, pose):
+        """Returns a new PoseArray with each pose premultiplied by pose: pose*self[i]
+
+        :param pose: pose
+        :type pose: :class:`.Mat`
+        """
+        return PoseArray(apply_many(pose, self.array))
+
+    def inv(self):
+        """Returns a new PoseArray with the inverse of each pose (homogeneous matrices assumed)"""
+        import numpy as np
+        H = self.array
+        Rt = np.swapaxes(H[:, :3, :3], 1, 2)
+        Hout = np.zeros_like(H)
+        Hout[:, :3, :3] = Rt
+        Hout[:, :3, 3] = -np.einsum('nij,nj->ni', Rt, H[:, :3, 3])
+        Hout[:, 3, 3] = 1.0
+        return PoseArray(Hout)
+
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
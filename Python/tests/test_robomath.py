@@ -0,0 +1,349 @@
+import unittest
+import itertools
+import random
+import math
+import os
+import shutil
+import tempfile
+from math import pi
+
+from robodk import robomath
+from robodk.robomath import Mat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _test_poses():
+    """Returns a list of poses that includes singular (+-90 deg) and 180 deg rotations"""
+    angles = [0, pi / 2, -pi / 2, pi, -pi, pi / 4, 1.0]
+    poses = [robomath.transl(10, -20, 30) * robomath.rotx(rx) * robomath.roty(ry) * robomath.rotz(rz) for rx, ry, rz in itertools.product(angles, repeat=3)]
+    poses += [robomath.eye(4), robomath.rotx(pi), robomath.roty(pi), robomath.rotz(pi), robomath.roty(pi / 2), robomath.roty(-pi / 2)]
+    poses += [robomath.Pose(0, 0, 0, 180, 0, 0), robomath.Pose(1, 2, 3, 0, 180, 0), robomath.Pose(1, 2, 3, 0, 90, 0), robomath.Pose(1, 2, 3, 10, -90, 20)]
+    random.seed(1)
+    poses += [robomath.Pose(*[random.uniform(-500, 500) for i in range(3)] + [random.uniform(-180, 180) for i in range(3)]) for j in range(50)]
+    return poses
+
+
+def _angle_diff(a, b):
+    """Returns the difference between two angles in radians, wrapped to [-pi, pi)"""
+    return (a - b + pi) % (2 * pi) - pi
+
+
+def _save_mat_per_cell(rows, strfile, separator=','):
+    """Writes a matrix (list of rows) the way the original Mat.SaveMat did: one line per column and one write per value"""
+    file = open(strfile, 'w')
+    for j in range(len(rows[0])):
+        for i in range(len(rows)):
+            file.write(('%.6f' + separator) % rows[i][j])
+        file.write('\n')
+    file.close()
+
+
+class TestMat(unittest.TestCase):
+
+    def assertMatAlmostEqual(self, mat1, mat2, places=9):
+        self.assertEqual(mat1.size(), mat2.size())
+        for row1, row2 in zip(mat1.rows, mat2.rows):
+            for value1, value2 in zip(row1, row2):
+                self.assertAlmostEqual(value1, value2, places=places)
+
+    def test_converter_keywords(self):
+        pose = robomath.Motoman_2_Pose(xyzwpr=[1, 2, 3, 10, 20, 30])
+        self.assertMatAlmostEqual(pose, robomath.xyzrpw_2_pose([1, 2, 3, 10, 20, 30]))
+        self.assertEqual(robomath.Pose_2_Fanuc(H=pose), robomath.pose_2_xyzrpw(pose))
+        self.assertEqual(robomath.Techman_2_Pose.__name__, 'Techman_2_Pose')
+
+    def test_mul_keeps_value_types(self):
+        mat = Mat([[i * 5 + j for j in range(5)] for i in range(5)])
+        result = mat * mat
+        self.assertTrue(all(type(value) is int for row in result.rows for value in row))
+        big = Mat([[2**70 + j for j in range(5)] for i in range(5)])
+        self.assertEqual((big * big).rows[0][0], sum((2**70 + k) * 2**70 for k in range(5)))
+
+    def test_mul_many(self):
+        poses = _test_poses()[:10]
+        expected = poses[0]
+        for pose in poses[1:]:
+            expected = expected * pose
+        self.assertMatAlmostEqual(Mat.mul_many(poses), expected, 6)
+        self.assertMatAlmostEqual(Mat.mul_many([]), robomath.eye(4))
+
+    def test_invH(self):
+        for pose in _test_poses():
+            self.assertMatAlmostEqual(pose.invH() * pose, robomath.eye(4))
+        rows = robomath.Pose(1, 2, 3, 10, 20, 30).rows
+        rows[3] = [0, 0, 0, 2]
+        self.assertEqual(Mat(rows).invH().rows[3], [0, 0, 0, 2])
+
+    def test_rel_pose_not_normalized(self):
+        rows = robomath.Pose(1, 2, 3, 10, 20, 30).rows
+        rows[3] = [0, 0, 0, 2]
+        pose1 = Mat(rows)
+        pose2 = robomath.Pose(-4, 5, 6, 40, -50, 60)
+        self.assertMatAlmostEqual(robomath.rel_pose(pose1, pose2), pose1.invH() * pose2)
+        self.assertEqual(robomath.rel_pose(pose1, pose2).rows[3], [0, 0, 0, 2])
+
+    def test_rel_pose(self):
+        poses = _test_poses()
+        for pose1, pose2 in zip(poses, poses[1:]):
+            self.assertMatAlmostEqual(robomath.rel_pose(pose1, pose2), pose1.invH() * pose2)
+            self.assertMatAlmostEqual(pose2.relative_to(pose1), pose1.invH() * pose2)
+
+    def test_is_close(self):
+        pose = robomath.Pose(1, 2, 3, 10, 20, 30)
+        self.assertTrue(pose.is_close(robomath.Pose(1.01, 2, 3, 10, 20, 30)))
+        self.assertFalse(pose.is_close(robomath.Pose(1.5, 2, 3, 10, 20, 30)))
+        self.assertFalse(pose.is_close(robomath.Pose(1, 2, 3, 10, 21, 30)))
+
+    def test_UR_2_Pose_translation(self):
+        pose = robomath.UR_2_Pose([1, 2, 3, 0, 0, 0])
+        self.assertEqual(pose.rows, [[1.0, 0.0, 0.0, 1], [0.0, 1.0, 0.0, 2], [0.0, 0.0, 1.0, 3], [0, 0, 0, 1]])
+        self.assertTrue(all(type(value) is float for row in pose.rows[:3] for value in row[:3]))
+
+    def test_RelTool_Offset(self):
+        for pose in _test_poses()[::7]:
+            delta = robomath.transl(10, 20, -30) * robomath.rotx(15 * pi / 180) * robomath.roty(-25 * pi / 180) * robomath.rotz(35 * pi / 180)
+            self.assertMatAlmostEqual(robomath.RelTool(pose, 10, 20, -30, 15, -25, 35), pose * delta)
+            self.assertMatAlmostEqual(robomath.Offset(pose, 10, 20, -30, 15, -25, 35), delta * pose)
+            self.assertMatAlmostEqual(pose.RelTool(10, 20, -30), pose * robomath.transl(10, 20, -30))
+        # The last row of the target is not assumed to be [0,0,0,1]
+        rows = robomath.Pose(1, 2, 3, 10, 20, 30).rows
+        rows[3] = [0.1, 0.2, 0.3, 1.0]
+        target = Mat(rows)
+        self.assertMatAlmostEqual(robomath.RelTool(target, 5, 6, 7, 8, 9, 10), target * robomath.Pose(5, 6, 7, 8, 9, 10))
+        self.assertMatAlmostEqual(robomath.Offset(target, 5, 6, 7, 8, 9, 10), robomath.Pose(5, 6, 7, 8, 9, 10) * target)
+
+    def test_Pose_Split(self):
+        # Same poses as the original implementation: pose1 * UR_2_Pose(i/steps of the UR target of the relative pose)
+        for pose1, pose2 in [(robomath.Pose(0, 0, 0, 0, 0, 0), robomath.Pose(100, 0, 0, 0, 0, 90)), (robomath.Pose(10, 20, 30, 40, 50, 60), robomath.Pose(-50, 70, 20, -30, 170, 10)),
+                             (robomath.Pose(1, 2, 3, 0, 0, 0), robomath.Pose(11, 2, 3, 180, 0, 0)), (robomath.Pose(5, 5, 5, 10, 20, 30), robomath.Pose(25, -5, 5, 10, 20, 30))]:
+            delta = pose1.invH() * pose2
+            steps = max(1, int(robomath.norm(delta.Pos()) / 2.5))
+            target = robomath.Pose_2_UR(delta)
+            expected = [pose1 * robomath.UR_2_Pose([value * (i + 1) / steps for value in target]) for i in range(steps - 1)]
+            result = robomath.Pose_Split(pose1, pose2, 2.5)
+            self.assertEqual(len(result), len(expected))
+            for pose, pose_expected in zip(result, expected):
+                self.assertMatAlmostEqual(pose, pose_expected)
+        pose = robomath.Pose(1, 2, 3, 4, 5, 6)
+        self.assertEqual(robomath.Pose_Split(pose, pose.Offset(0.5, 0, 0)), [pose.Offset(0.5, 0, 0)])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_fitPlane(self):
+        rng = np.random.RandomState(3)
+        normal = np.array([1.0, -2.0, 3.0]) / np.linalg.norm([1.0, -2.0, 3.0])
+        u = np.cross(normal, [1.0, 0, 0])
+        v = np.cross(normal, u)
+        uv = rng.uniform(-100, 100, (200, 2))
+        points = np.array([10, 20, 30]) + uv[:, :1] * u + uv[:, 1:] * v + rng.normal(0, 0.01, (200, 1)) * normal
+        pplane, vplane = robomath.fitPlane(points.tolist())
+        np.testing.assert_allclose(pplane, points.mean(axis=0), atol=1e-9)
+        self.assertIsInstance(vplane, list)
+        self.assertAlmostEqual(abs(np.dot(vplane, normal)), 1.0, places=6)
+        # Same normal (up to the sign) as the SVD of the points with a column of ones used before
+        B = np.linalg.svd(np.hstack([points, np.ones((200, 1))]), 0)[2][3, :]
+        self.assertAlmostEqual(abs(np.dot(vplane, B[:3] / np.linalg.norm(B[:3]))), 1.0, places=6)
+        # 3 points are enough to define the plane
+        pplane, vplane = robomath.fitPlane([[0, 0, 1], [1, 0, 1], [0, 1, 1]])
+        np.testing.assert_allclose(np.abs(vplane), [0, 0, 1], atol=1e-12)
+
+    def test_eq(self):
+        pose = robomath.Pose(1, 2, 3, 10, 20, 30)
+        self.assertTrue(pose == Mat(pose))
+        self.assertFalse(pose != Mat(pose))
+        self.assertTrue(robomath.eye(4) == Mat([[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]))
+        # Element-wise comparison: poses within the tolerance of is_close are not equal
+        close = robomath.Pose(1.001, 2, 3, 10, 20, 30)
+        self.assertFalse(pose == close)
+        self.assertTrue(pose.is_close(close))
+        self.assertFalse(robomath.eye(4) == robomath.eye(3))
+        self.assertFalse(pose == pose.rows)
+        self.assertFalse(pose == None)
+        self.assertIn(Mat(pose), [robomath.eye(4), pose])
+        self.assertNotIn(close, [robomath.eye(4), pose])
+
+    def test_pose_2_quaternion(self):
+        # Largest of trace (small rotations), a (around X), b (around Y) and c (around Z): one pose per branch of Shepperd's method
+        for rot, axis in [(robomath.rotx, 1), (robomath.roty, 2), (robomath.rotz, 3)]:
+            for angle in [0.3, -0.3, 2.5, -2.5]:
+                expected = [math.cos(angle / 2), 0, 0, 0]
+                expected[axis] = math.sin(angle / 2)
+                q = robomath.pose_2_quaternion(rot(angle))
+                for value, value_expected in zip(q, expected):
+                    self.assertAlmostEqual(value, value_expected, places=12)
+        for pose in _test_poses():
+            q = robomath.pose_2_quaternion(pose)
+            self.assertGreaterEqual(q[0], 0)
+            self.assertAlmostEqual(sum(value * value for value in q), 1.0, places=12)
+            pose_q = robomath.quaternion_2_pose(q)
+            pose_q.setPos(pose.Pos())
+            self.assertMatAlmostEqual(pose_q, pose)
+
+    def test_quaternion_2_pose_input(self):
+        q = [2.0, 0.0, 0.0, 2.0]
+        pose = robomath.quaternion_2_pose(q)
+        self.assertEqual(q, [2.0, 0.0, 0.0, 2.0])
+        self.assertMatAlmostEqual(pose, robomath.rotz(pi / 2))
+        self.assertMatAlmostEqual(robomath.quaternion_2_pose((2.0, 0.0, 0.0, 2.0)), pose)
+        self.assertMatAlmostEqual(robomath.quaternion_2_pose((1, 0, 0, 0)), robomath.eye(4))
+
+    def assertSameFile(self, strfile1, strfile2):
+        with open(strfile1) as file1, open(strfile2) as file2:
+            self.assertEqual(file1.read(), file2.read())
+
+    def mkdtemp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        return tmpdir
+
+    def test_SaveMat(self):
+        random.seed(2)
+        tmpdir = self.mkdtemp()
+        strfile = os.path.join(tmpdir, 'mat.txt')
+        strfile_expected = os.path.join(tmpdir, 'expected.txt')
+        for mat in [robomath.Pose(1, 2, 3, 10, 20, 30), robomath.eye(4), Mat([[random.uniform(-1e4, 1e4) for j in range(7)] for i in range(3)]), Mat([[1, 2, 3]])]:
+            for separator in [',', ' ', '\t']:
+                mat.SaveMat(strfile, separator)
+                _save_mat_per_cell(mat.rows, strfile_expected, separator)
+                self.assertSameFile(strfile, strfile_expected)
+        # A '%' in the separator is written as is
+        Mat([[1.5, 2]]).SaveMat(strfile, '%')
+        with open(strfile) as file:
+            self.assertEqual(file.read(), '1.500000%\n2.000000%\n')
+
+    def test_SaveMat_chunks(self):
+        # Files of more than 1024 lines are written in several chunks
+        random.seed(3)
+        tmpdir = self.mkdtemp()
+        strfile = os.path.join(tmpdir, 'mat.txt')
+        strfile_expected = os.path.join(tmpdir, 'expected.txt')
+        for ncols in [1023, 1024, 1025, 2048, 3000]:
+            mat = Mat([[random.uniform(-1e3, 1e3) for j in range(ncols)] for i in range(3)])
+            mat.SaveMat(strfile)
+            _save_mat_per_cell(mat.rows, strfile_expected)
+            self.assertSameFile(strfile, strfile_expected)
+            # SaveCSV writes one line per row
+            mat.tr().SaveCSV(strfile)
+            self.assertSameFile(strfile, strfile_expected)
+        Mat([]).SaveMat(strfile)
+        with open(strfile) as file:
+            self.assertEqual(file.read(), '')
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.poses = _test_poses()
+
+    def test_Pose_2_KUKA_batch(self):
+        result = robomath.Pose_2_KUKA_batch(self.poses)
+        self.assertEqual(result.shape, (len(self.poses), 6))
+        for pose, row in zip(self.poses, result):
+            np.testing.assert_allclose(row, robomath.Pose_2_KUKA(pose), atol=1e-7)
+
+    def test_KUKA_2_Pose_batch(self):
+        targets = [robomath.Pose_2_KUKA(pose) for pose in self.poses]
+        result = robomath.KUKA_2_Pose_batch(targets)
+        for target, H in zip(targets, result):
+            np.testing.assert_allclose(H, robomath.KUKA_2_Pose(target).rows, atol=1e-9)
+
+    def test_Pose_2_TxyzRxyz_batch(self):
+        result = robomath.Pose_2_TxyzRxyz_batch(self.poses)
+        for pose, row in zip(self.poses, result):
+            expected = robomath.Pose_2_TxyzRxyz(pose)
+            np.testing.assert_allclose(row[:3], expected[:3], atol=1e-9)
+            np.testing.assert_allclose(_angle_diff(row[3:], np.array(expected[3:], dtype=float)), 0, atol=1e-7)
+
+    def test_Pose_2_TxyzRxyz_batch_180deg(self):
+        for pose in [robomath.rotx(pi), robomath.roty(pi), robomath.rotz(pi), robomath.Pose(0, 0, 0, 0, 180, 0)]:
+            rxyz = robomath.Pose_2_TxyzRxyz_batch([pose])[0, 3:]
+            self.assertTrue(np.all(rxyz > -pi), rxyz)
+        np.testing.assert_array_equal(robomath.Pose_2_TxyzRxyz_batch([robomath.roty(pi)])[0], robomath.Pose_2_TxyzRxyz(robomath.roty(pi)))
+
+    def test_Pose_2_UR_batch(self):
+        result = robomath.Pose_2_UR_batch(self.poses)
+        for pose, row in zip(self.poses, result):
+            np.testing.assert_allclose(row, robomath.Pose_2_UR(pose), atol=1e-7)
+
+    def test_UR_2_Pose_batch(self):
+        targets = [robomath.Pose_2_UR(pose) for pose in self.poses]
+        result = robomath.UR_2_Pose_batch(targets)
+        for target, H in zip(targets, result):
+            np.testing.assert_allclose(H, robomath.UR_2_Pose(target).rows, atol=1e-9)
+
+    def test_rot_many(self):
+        angles = np.array([0, 0.3, pi / 2, pi, -1.2])
+        for rot_many, rot in [(robomath.rotx_many, robomath.rotx), (robomath.roty_many, robomath.roty), (robomath.rotz_many, robomath.rotz)]:
+            result = rot_many(angles)
+            self.assertEqual(result.shape, (len(angles), 4, 4))
+            for angle, H in zip(angles, result):
+                np.testing.assert_allclose(H, rot(angle).rows, atol=1e-12)
+
+    def test_apply_many(self):
+        pose = robomath.Pose(1, 2, 3, 10, 20, 30)
+        result = robomath.apply_many(pose, self.poses)
+        for pose2, H in zip(self.poses, result):
+            np.testing.assert_allclose(H, (pose * pose2).rows, atol=1e-9)
+
+    def test_dh_chain(self):
+        params = [[0.1, 0, 400, -pi / 2], [-pi / 2, 560, 0, 0], [0.3, 35, 0, -pi / 2], [0.2, 0, 515, pi / 2], [-0.5, 0, 0, -pi / 2], [0.4, 0, 80, 0]]
+        expected = Mat.mul_many([robomath.dh(p) for p in params])
+        np.testing.assert_allclose(robomath.dh_chain(params), expected.rows, atol=1e-9)
+        np.testing.assert_allclose(robomath.dh_chain_to_pose(params).rows, expected.rows, atol=1e-9)
+        expected = Mat.mul_many([robomath.dhm(p) for p in params])
+        np.testing.assert_allclose(robomath.dhm_chain(params), expected.rows, atol=1e-9)
+        np.testing.assert_allclose(robomath.dh_chain([]), np.eye(4))
+
+    def test_Mat_numpy(self):
+        H = np.array(self.poses[5].rows)
+        self.assertEqual(Mat(H).rows, self.poses[5].rows)
+        np.testing.assert_array_equal(np.asarray(self.poses[5]), H)
+        with self.assertRaises(TypeError):
+            Mat(np.float64(1.0))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestPoseArray(unittest.TestCase):
+
+    def setUp(self):
+        self.poses = _test_poses()
+        self.pose_array = robomath.PoseArray(self.poses)
+
+    def test_items(self):
+        self.assertEqual(len(self.pose_array), len(self.poses))
+        self.assertEqual(self.pose_array[3].rows, [[float(value) for value in row] for row in self.poses[3].rows])
+        self.assertEqual([pose.rows for pose in self.pose_array], [pose.rows for pose in self.pose_array.tolist()])
+        self.assertEqual(len(robomath.PoseArray()), 0)
+
+    def test_slice(self):
+        part = self.pose_array[0:2]
+        self.assertIsInstance(part, robomath.PoseArray)
+        self.assertEqual(len(part), 2)
+        self.assertEqual(part[1].rows, self.pose_array[1].rows)
+        with self.assertRaises(TypeError):
+            self.pose_array[0, 1]
+
+    def test_positions(self):
+        np.testing.assert_allclose(self.pose_array.positions(), [pose.Pos() for pose in self.poses])
+
+    def test_apply(self):
+        pose = robomath.Pose(1, 2, 3, 10, 20, 30)
+        result = self.pose_array.apply(pose)
+        for pose2, pose_result in zip(self.poses, result):
+            np.testing.assert_allclose(pose_result.rows, (pose * pose2).rows, atol=1e-9)
+
+    def test_inv(self):
+        result = self.pose_array.inv()
+        for pose, pose_result in zip(self.poses, result):
+            np.testing.assert_allclose(pose_result.rows, pose.inv().rows, atol=1e-9)
+
+    def test_batch_input(self):
+        np.testing.assert_allclose(robomath.Pose_2_KUKA_batch(self.pose_array), robomath.Pose_2_KUKA_batch(self.poses))
+
+
+if __name__ == '__main__':
+    unittest.main()